@@ -1,19 +1,142 @@
-rule tag_nvim:
+# Whole pipeline: URL discovery -> color harvest -> pack -> sharded compare
+# -> merge / top-K -> screenshots. Run from src/, e.g.
+#   snakemake -s Snakefile.py --cores 8 all
+#   snakemake -s Snakefile.py --cores 8 --config shards=32 all
+# The nvim TSV is split into stable shards (by repo url). pack_nvim is a
+# checkpoint, so shard inputs are re-checked after it runs; Snakemake compares
+# checksums of small files (--max-checksum-file-size), so only shards whose
+# contents changed are recompared.
+
+SHARDS = int(config.get('shards', 8))
+NVIM_URLS = {
+    'nord': 'https://github.com/gbprod/nord.nvim',
+    'dracula': 'https://github.com/pze/dracula-mini.nvim',
+    'catppuccin': 'https://github.com/catppuccin/nvim',
+}
+
+wildcard_constraints:
+    i=r'\d+',
+
+rule all:
     input:
-        '../data/interim/{nvim}_results.tsv',
+        '../data/end/comparison_results.tsv',
+        '../data/end/top50_filtered.tsv',
+        '../data/end/dist.tsv',
+
+# ---------- URL discovery ----------
+rule iterm_urls:
     output:
-        '../data/interim/tmp/{nvim}_results.tsv',
+        '../data/interim/urls/iterm_themes.csv',
     shell:
-        'python tag_nvim.py {wildcards.nvim} {input} {output}'
+        'python -m colors iterm-urls --out {output}'
+
+rule nvim_urls:
+    output:
+        '../data/interim/urls/neovim_colorschemes.csv',
+    shell:
+        'python -m colors nvim-urls --out {output}'
+
+# ---------- Color harvesting ----------
+# --config iterm_dir=PATH reads themes from a local directory (an
+# iTerm2-Color-Schemes clone, Ghostty's themes, ...) instead of the network.
+ITERM_DIR = config.get('iterm_dir')
 
-rule cat_dist:
+if ITERM_DIR:
+    rule store_iterm:
+        output:
+            '../data/interim/iterm_colors.tsv',
+        shell:
+            'python -m colors store-iterm --dir "%s" --out {output}' % ITERM_DIR
+else:
+    rule store_iterm:
+        input:
+            '../data/interim/urls/iterm_themes.csv',
+        output:
+            '../data/interim/iterm_colors.tsv',
+        shell:
+            'python -m colors store-iterm --csv {input} --out {output}'
+
+rule harvest_nvim:
     input:
-        expand('../data/interim/tmp/{nvim}_results.tsv', nvim=('nord', 'dracula', 'catppuccin'))
+        '../data/interim/urls/neovim_colorschemes.csv',
     output:
-        '../data/end/dist.tsv',
+        '../data/interim/urls/nvim_check_results.tsv',
     shell:
-        'python-cath {input} {output}'
+        'python -m colors harvest --csv {input} --out {output}'
 
-rule all:
+# ---------- Packing ----------
+checkpoint pack_nvim:
     input:
-        '../data/end/dist.tsv',
+        '../data/interim/urls/nvim_check_results.tsv',
+    output:
+        expand('../data/interim/shards/nvim/shard_{i}.tsv', i=range(SHARDS)),
+    shell:
+        'python -m colors pack --tsv {input} --shards %d '
+        '--out-dir ../data/interim/shards/nvim' % SHARDS
+
+def nvim_shard(wildcards):
+    # resolved after pack_nvim has run, so each shard is checked on its own
+    out = checkpoints.pack_nvim.get().output
+    return out[int(wildcards.i)]
+
+# ---------- Sharded all-pairs comparison ----------
+rule compare_shard:
+    input:
+        nvim=nvim_shard,
+        iterm='../data/interim/iterm_colors.tsv',
+    output:
+        '../data/interim/shards/cmp/shard_{i}.tsv',
+    threads: 1
+    shell:
+        'python -m colors compare --nvim {input.nvim} --iterm {input.iterm} '
+        '--workers {threads} --out {output}'
+
+# ---------- Top-K reduction ----------
+rule merge_compare:
+    input:
+        expand('../data/interim/shards/cmp/shard_{i}.tsv', i=range(SHARDS)),
+    output:
+        '../data/end/comparison_results.tsv',
+    shell:
+        'python -m colors merge {input} --out {output}'
+
+rule top_pairs:
+    input:
+        tsv='../data/end/comparison_results.tsv',
+        nvim_csv='../data/interim/urls/neovim_colorschemes.csv',
+    output:
+        '../data/end/top50_filtered.tsv',
+    shell:
+        'python top_pairs.py --tsv {input.tsv} --nvim_csv {input.nvim_csv} '
+        '--out {output}'
+
+# ---------- Screenshots (macOS, Ghostty) ----------
+# theme_list.csv is an external, hand-curated input that no rule produces:
+# nvim_name,colorscheme_name rows mapping each Neovim repo to the name its
+# `:colorscheme` command takes. Create it before running this rule.
+THEME_LIST = '../data/end/theme_list.csv'
+
+rule screenshots:
+    input:
+        '../data/end/top50_filtered.tsv',
+        THEME_LIST,
+        'theme_demo.py',
+    output:
+        '../data/interim/screenshots/manifest.json',
+    shell:
+        'python shot.py'
+
+# ---------- Per-theme crawls (nord, dracula, catppuccin) ----------
+# One pass over the iTerm schemes scores every target; dist.tsv is tagged
+# with the nvim theme (nvimTheme column) like tag_nvim.py output.
+rule nvim_vs_iterm:
+    input:
+        '../data/interim/urls/iterm_themes.csv',
+    output:
+        dist='../data/end/dist.tsv',
+        per_theme=expand('../data/interim/{nvim}_results.tsv', nvim=NVIM_URLS),
+    params:
+        targets=' '.join('%s=%s' % kv for kv in NVIM_URLS.items()),
+    shell:
+        'python nvim_vs_all_iterm.py --csv {input} --nvim {params.targets} '
+        "--out {output.dist} --out-pattern '../data/interim/{{tag}}_results.tsv'"
@@ -1,31 +1,19 @@
 import argparse
 import csv
 import time
-from urllib.parse import urlparse
 
-import requests
-
-
-def is_github_repo_url(url):
-    """Check if the URL looks like github.com/owner/repo"""
-    u = urlparse(url)
-    parts = [p for p in u.path.split("/") if p]
-    return u.netloc == "github.com" and len(parts) == 2
+from colors.extract import is_theme_file
+from colors.fetch import get_repo_tree, is_github_repo_url, repo_owner_name
 
 
 def repo_has_theme_files(owner, repo):
     """Check GitHub repo tree for .lua or .vim files likely containing theme colors."""
     try:
-        api = f"https://api.github.com/repos/{owner}/{repo}/git/trees/HEAD?recursive=1"
-        r = requests.get(api, timeout=20)
-        if r.status_code != 200:
-            return False, f"API error {r.status_code}"
-        tree = r.json().get("tree", [])
+        tree, err = get_repo_tree(owner, repo)
+        if tree is None:
+            return False, err
         for obj in tree:
-            path = obj.get("path", "").lower()
-            if path.endswith((".lua", ".vim")) and any(
-                seg in path for seg in ("color", "theme", "palette")
-            ):
+            if is_theme_file(obj.get("path", "")):
                 return True, "theme file found"
         return False, "no theme files"
     except Exception as e:
@@ -54,7 +42,7 @@ def main():
                 print(f"{name}: {url} -> invalid_repo_url")
                 continue
 
-            owner, repo = [p for p in urlparse(url).path.split("/") if p]
+            owner, repo = repo_owner_name(url)
             ok, reason = repo_has_theme_files(owner, repo)
             status = "compatible" if ok else f"incompatible ({reason})"
             results.append((name, url, status))
@@ -0,0 +1,6 @@
+"""Shared color-theme library: fetch, extract, convert, distance and rank.
+
+Heavy dependencies (requests, numpy, skimage, colormath, playwright) are
+imported inside the functions that need them so ``python -m colors`` and
+quick subcommands start fast.
+"""
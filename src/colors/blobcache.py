@@ -0,0 +1,57 @@
+"""Extracted colors keyed by git blob SHA (SQLite).
+
+A blob sha names a file's exact bytes, so a palette file shared by forks,
+vendored copies or a re-run is downloaded and scanned once; every other
+copy is answered from the cache without touching the network.
+"""
+
+import sqlite3
+import threading
+
+BLOB_CACHE = "../data/interim/blob_colors.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    sha TEXT PRIMARY KEY,
+    colors TEXT NOT NULL
+)
+"""
+
+
+class BlobCache:
+    """sha -> hex colors extracted from that blob, with hit/miss counts.
+
+    Safe to share between threads (one connection behind a lock).
+    """
+
+    def __init__(self, path=BLOB_CACHE):
+        import os
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # parallel harvests may share one cache; wait on the write lock
+        self.conn = sqlite3.connect(path, timeout=60, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(SCHEMA)
+        self.hits = self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, sha):
+        """Cached hex colors of blob sha, or None."""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT colors FROM blobs WHERE sha = ?", (sha,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return row[0].split(",") if row[0] else []
+
+    def put(self, sha, hexes):
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO blobs VALUES (?, ?)", (sha, ",".join(hexes))
+            )
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,495 @@
+"""``python -m colors <subcommand>``: one entry point for the whole pipeline."""
+
+import argparse
+import json
+import os
+
+
+def cmd_iterm_urls(args):
+    from colors.fetch import fetch_iterm_scheme_urls, write_name_url_csv
+
+    themes = fetch_iterm_scheme_urls()
+    print(f"Found {len(themes)} themes")
+    write_name_url_csv(args.out, themes)
+
+
+def cmd_nvim_urls(args):
+    from colors.fetch import (
+        NVIM_TOPICS,
+        scrape_nvim_topic,
+        search_topic_repos,
+        write_name_url_csv,
+    )
+
+    if args.browser:
+        themes = scrape_nvim_topic(args.url)
+    else:
+        themes = search_topic_repos(args.topic or NVIM_TOPICS, workers=args.workers)
+    n = write_name_url_csv(args.out, themes)
+    print(f"Saved {n} repos to {args.out}")
+
+
+def cmd_store_iterm(args):
+    from colors.extract import harvest_iterm, harvest_theme_dir
+
+    if args.dir:
+        harvest_theme_dir(args.dir, args.out, workers=args.workers)
+    else:
+        harvest_iterm(args.csv, args.out, resume=args.resume, journal=args.journal)
+
+
+def cmd_harvest(args):
+    from colors.extract import harvest_nvim
+
+    harvest_nvim(
+        args.csv,
+        args.out,
+        resume=args.resume,
+        journal=args.journal,
+        blob_cache=args.blob_cache,
+        fetchers=args.fetchers,
+        extractors=args.extractors,
+        refresh_meta=args.refresh_meta,
+    )
+
+
+def cmd_compare(args):
+    from colors.rank import compare_all, load_themes, result_header, write_results
+    from colors.shard import select_shard
+
+    load = dict(metric=args.metric, precision=args.precision)
+    # only the scraped nvim palettes are capped; iTerm schemes are ~22 slots
+    nvim_themes = load_themes(args.nvim, **load, **reduce_kwargs(args))
+    if args.shard:
+        nvim_themes = select_shard(nvim_themes, *args.shard)
+    iterm_themes = load_themes(args.iterm, **load)
+    results = compare_all(
+        nvim_themes,
+        iterm_themes,
+        workers=args.workers,
+        dedupe=not args.no_dedupe,
+        tolerance=args.dedupe_tolerance,
+        metric=args.metric,
+        store=args.score_store,
+        precision=args.precision,
+        kernel=args.kernel,
+    )
+    write_results(args.out, results[: args.top_k], header=result_header(args.metric))
+
+
+def cmd_pack(args):
+    from colors.shard import pack_shards
+
+    out_paths = [
+        os.path.join(args.out_dir, f"shard_{i}.tsv") for i in range(args.shards)
+    ]
+    changed = pack_shards(args.tsv, out_paths)
+    print(f"Packed {args.tsv} into {args.shards} shards ({changed} changed)")
+
+
+def cmd_merge(args):
+    from colors.shard import merge_results
+
+    results = merge_results(args.inputs, args.out, top_k=args.top_k)
+    print(f"Merged {len(args.inputs)} shards, {len(results)} pairs -> {args.out}")
+
+
+def cmd_diff(args):
+    from colors.rank import diff_urls
+
+    print(json.dumps(diff_urls(args.iterm, args.nvim), indent=2))
+
+
+def cmd_serve(args):
+    from colors.serve import Corpus, serve
+
+    corpus = Corpus(args.nvim, args.iterm, metric=args.metric, **reduce_kwargs(args))
+    serve(corpus, port=args.port, socket_path=args.socket, poll=args.poll)
+
+
+def cmd_validate(args):
+    import sys
+
+    from colors.shard import _read_results
+    from colors.validate import (
+        check_engine_metric,
+        check_tolerances,
+        compare_results,
+        format_report,
+        validate,
+    )
+
+    if args.ref_tsv and args.cand_tsv:
+        report = compare_results(
+            _read_results(args.ref_tsv)[1], _read_results(args.cand_tsv)[1], args.top_k
+        )
+    elif args.nvim and args.iterm:
+        try:
+            for engine in (args.reference, args.candidate):
+                check_engine_metric(engine, args.metric)
+        except ValueError as e:
+            sys.exit(f"validate: {e}")
+        report = validate(
+            args.nvim,
+            args.iterm,
+            reference=args.reference,
+            candidate=args.candidate,
+            metric=args.metric,
+            sample_nvim=args.sample_nvim,
+            sample_iterm=args.sample_iterm,
+            top_k=args.top_k,
+            workers=args.workers,
+        )
+    else:
+        sys.exit("validate needs --nvim and --iterm, or --ref-tsv and --cand-tsv")
+
+    print(format_report(report, args.top_k))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    failures = check_tolerances(
+        report,
+        max_error=args.max_error,
+        mean_error=args.mean_error,
+        min_tau=args.min_tau,
+        min_overlap=args.min_overlap,
+    )
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        sys.exit(1)
+    print("PASS")
+
+
+def cmd_palette(args):
+    from colors.convert import rgb_to_hex
+    from colors.extract import load_iterm_colors, load_nvim_colors
+
+    if args.url.endswith(".itermcolors"):
+        colors = load_iterm_colors(args.url)
+    else:
+        colors = load_nvim_colors(args.url)
+    print(",".join(rgb_to_hex(c) for c in colors))
+
+
+def add_theme_source_arguments(ap):
+    """--csv of theme URLs, or --dir of local iTerm/Ghostty/kitty/alacritty files."""
+    src = ap.add_mutually_exclusive_group(required=True)
+    src.add_argument("--csv", help="CSV file with columns: name,url")
+    src.add_argument(
+        "--dir",
+        help="Local theme directory (.itermcolors, Ghostty, kitty .conf, alacritty)",
+    )
+    ap.add_argument(
+        "--workers", type=int, default=None, help="Parser processes for --dir"
+    )
+
+
+def add_journal_arguments(ap):
+    ap.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip entries already in the journal from an earlier run",
+    )
+    ap.add_argument(
+        "--journal",
+        default=None,
+        help="Append-only JSONL journal (default: <out>.journal.jsonl)",
+    )
+
+
+def add_blob_cache_argument(ap):
+    from colors.blobcache import BLOB_CACHE
+
+    ap.add_argument(
+        "--blob-cache",
+        default=BLOB_CACHE,
+        metavar="DB",
+        help="SQLite cache of extracted colors by git blob sha; files already "
+        "seen in any repo or run are not fetched again ('' disables; default "
+        "%(default)s)",
+    )
+
+
+def add_refresh_meta_argument(ap):
+    from colors.fetch import META_CACHE, META_TTL
+
+    ap.add_argument(
+        "--refresh-meta",
+        action="store_true",
+        help=f"Re-resolve every repo's HEAD sha instead of using {META_CACHE} "
+        f"(entries older than {META_TTL // 3600}h are re-resolved anyway)",
+    )
+
+
+def add_pipeline_arguments(ap):
+    ap.add_argument(
+        "--fetchers",
+        type=int,
+        default=8,
+        help="Threads fetching repo trees and files; extraction runs in a "
+        "process pool fed through bounded queues (0: one repo at a time, "
+        "default %(default)s)",
+    )
+    ap.add_argument(
+        "--extractors",
+        type=int,
+        default=None,
+        help="Extraction processes with --fetchers (default: all cores)",
+    )
+
+
+def add_dedupe_arguments(ap):
+    ap.add_argument(
+        "--no-dedupe",
+        action="store_true",
+        help="Score every theme separately even if palettes are identical",
+    )
+    ap.add_argument(
+        "--dedupe-tolerance",
+        type=float,
+        default=None,
+        metavar="DE",
+        help="Also collapse equal-size palettes matching within this CIE76 ΔE",
+    )
+
+
+def add_reduce_arguments(ap):
+    ap.add_argument(
+        "--reduce-k",
+        type=int,
+        default=None,
+        metavar="K",
+        help="Cap each nvim palette to K representative colors (weighted); "
+        "iTerm palettes are used as is",
+    )
+    ap.add_argument(
+        "--merge-de",
+        type=float,
+        default=None,
+        metavar="DE",
+        help="Merge nvim colors within this CIE76 ΔE before capping",
+    )
+    ap.add_argument(
+        "--reduce-method",
+        choices=("kmeans", "median-cut"),
+        default="kmeans",
+        help="How to cap nvim palettes to K colors (default kmeans)",
+    )
+
+
+def reduce_kwargs(args):
+    """nvim load_themes keyword arguments from add_reduce_arguments options."""
+    return {
+        "k": args.reduce_k,
+        "merge_de": args.merge_de,
+        "method": args.reduce_method,
+    }
+
+
+def add_metric_argument(ap, choices=None):
+    from colors.metrics import DEFAULT_METRIC, METRICS
+
+    ap.add_argument(
+        "--metric",
+        choices=choices or list(METRICS),
+        default=DEFAULT_METRIC,
+        help="Perceptual distance for the *_lab columns; other metrics rename "
+        "them to *_<metric> (default ciede2000)",
+    )
+
+
+def add_precision_argument(ap):
+    from colors.metrics import DEFAULT_PRECISION, PRECISIONS
+
+    ap.add_argument(
+        "--precision",
+        choices=PRECISIONS,
+        default=DEFAULT_PRECISION,
+        help="float32: float32 Lab and uint8 RGB kernels, about half the memory "
+        "traffic; scores move by <1e-3, rankings unchanged in validation "
+        "(default float64)",
+    )
+
+
+def add_kernel_argument(ap):
+    from colors.rank import KERNELS
+
+    ap.add_argument(
+        "--kernel",
+        choices=KERNELS,
+        default="pairs",
+        help="pairs: one kernel call per theme pair; dense: each nvim palette "
+        "against all iTerm palettes in one padded batch; tiled: the whole score "
+        "matrix in cache-sized tiles, a GEMM each on BLAS threads for Euclidean "
+        "metrics, ciede2000/cie94 tiles on the --workers process pool. In "
+        "float64, dense/tiled scores agree with pairs to ~1e-13; in float32 to "
+        "float32 rounding (default pairs)",
+    )
+
+
+def add_store_argument(ap):
+    ap.add_argument(
+        "--score-store",
+        default=None,
+        metavar="DB",
+        help="SQLite pair-score store keyed by palette hash; only palette "
+        "pairs missing from it are scored (incremental update)",
+    )
+
+
+def add_shard_arguments(ap):
+    from colors.shard import parse_shard
+
+    ap.add_argument(
+        "--shard",
+        type=parse_shard,
+        default=None,
+        metavar="i/N",
+        help="Only score nvim themes in shard i of N (stable by repo url)",
+    )
+    ap.add_argument(
+        "--top-k",
+        type=int,
+        default=None,
+        help="Write only the K best pairs (partial for 'merge --top-k')",
+    )
+
+
+def build_parser():
+    ap = argparse.ArgumentParser(
+        prog="colors", description="Neovim / terminal theme color pipeline."
+    )
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("iterm-urls", help="List iTerm2-Color-Schemes .itermcolors URLs")
+    p.add_argument("--out", default="../data/interim/urls/iterm_themes.csv")
+    p.set_defaults(func=cmd_iterm_urls)
+
+    from colors.fetch import NVIM_TOPICS
+
+    p = sub.add_parser("nvim-urls", help="Discover Neovim colorscheme repos")
+    p.add_argument(
+        "--topic",
+        action="append",
+        help=f"GitHub topic to search (repeatable, default: {', '.join(NVIM_TOPICS)})",
+    )
+    p.add_argument("--workers", type=int, default=8, help="Concurrent search requests")
+    p.add_argument(
+        "--browser",
+        action="store_true",
+        help="Scrape the topic page with Playwright instead of the search API",
+    )
+    p.add_argument("--url", default="https://github.com/topics/neovim-colorscheme")
+    p.add_argument("--out", default="../data/interim/urls/neovim_colorschemes.csv")
+    p.set_defaults(func=cmd_nvim_urls)
+
+    p = sub.add_parser("store-iterm", help="Extract hex colors from iTerm themes")
+    add_theme_source_arguments(p)
+    p.add_argument("--out", default="../data/interim/iterm_colors.tsv")
+    add_journal_arguments(p)
+    p.set_defaults(func=cmd_store_iterm)
+
+    p = sub.add_parser("harvest", help="Extract hex colors from Neovim theme repos")
+    p.add_argument("--csv", required=True, help="CSV file with columns: name,url")
+    p.add_argument("--out", default="../data/interim/urls/nvim_check_results.tsv")
+    add_journal_arguments(p)
+    add_blob_cache_argument(p)
+    add_refresh_meta_argument(p)
+    add_pipeline_arguments(p)
+    p.set_defaults(func=cmd_harvest)
+
+    p = sub.add_parser("compare", help="Score every stored Neovim x iTerm pair")
+    p.add_argument(
+        "--nvim",
+        required=True,
+        help="TSV file with Neovim colors (name,url,status,colors)",
+    )
+    p.add_argument(
+        "--iterm", required=True, help="TSV file with iTerm colors (name,url,colors)"
+    )
+    p.add_argument("--out", default="results.tsv", help="Output TSV file")
+    p.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of parallel workers (default = num cores)",
+    )
+    add_shard_arguments(p)
+    add_dedupe_arguments(p)
+    add_reduce_arguments(p)
+    add_metric_argument(p)
+    add_precision_argument(p)
+    add_kernel_argument(p)
+    add_store_argument(p)
+    p.set_defaults(func=cmd_compare)
+
+    p = sub.add_parser("pack", help="Split a colors TSV into N stable shards")
+    p.add_argument("--tsv", required=True, help="Colors TSV (name,url,...,colors)")
+    p.add_argument("--shards", type=int, required=True, help="Number of shards")
+    p.add_argument("--out-dir", required=True, help="Directory for shard_<i>.tsv")
+    p.set_defaults(func=cmd_pack)
+
+    p = sub.add_parser("merge", help="Merge per-shard comparison results")
+    p.add_argument("inputs", nargs="+", help="Per-shard comparison TSVs")
+    p.add_argument("--out", required=True, help="Output TSV file")
+    p.add_argument("--top-k", type=int, default=None, help="Keep only the K best pairs")
+    p.set_defaults(func=cmd_merge)
+
+    p = sub.add_parser("diff", help="Compare one iTerm theme with one Neovim theme")
+    p.add_argument("--iterm", required=True, help="URL to .itermcolors file")
+    p.add_argument(
+        "--nvim", required=True, help="URL to Neovim theme (repo URL or raw file URL)"
+    )
+    p.set_defaults(func=cmd_diff)
+
+    p = sub.add_parser("serve", help="Answer compare/nearest queries from memory")
+    p.add_argument("--nvim", required=True, help="nvim_check_results.tsv")
+    p.add_argument("--iterm", required=True, help="iterm_colors.tsv")
+    p.add_argument("--port", type=int, default=8770, help="localhost HTTP port")
+    p.add_argument("--socket", help="Serve on this Unix socket instead")
+    p.add_argument(
+        "--poll",
+        type=float,
+        default=2.0,
+        help="Seconds between checks for changed TSVs (0 disables reload)",
+    )
+    add_reduce_arguments(p)
+    add_metric_argument(p)
+    p.set_defaults(func=cmd_serve)
+
+    from colors.validate import DEFAULT_TOLERANCES, ENGINES
+
+    p = sub.add_parser(
+        "validate", help="Check a comparison engine against a reference engine"
+    )
+    p.add_argument("--nvim", help="nvim colors TSV (the fixed corpus)")
+    p.add_argument("--iterm", help="iTerm colors TSV (the fixed corpus)")
+    p.add_argument("--reference", choices=list(ENGINES), default="colormath")
+    p.add_argument("--candidate", choices=list(ENGINES), default="numpy")
+    p.add_argument("--ref-tsv", help="Compare this results TSV instead of running")
+    p.add_argument("--cand-tsv", help="...against this one")
+    p.add_argument(
+        "--sample-nvim", type=int, default=10, help="nvim themes to keep (0 = all)"
+    )
+    p.add_argument(
+        "--sample-iterm", type=int, default=30, help="iTerm themes to keep (0 = all)"
+    )
+    p.add_argument("--top-k", type=int, default=10)
+    p.add_argument("--workers", type=int, default=1)
+    for name, value in DEFAULT_TOLERANCES.items():
+        p.add_argument(f"--{name.replace('_', '-')}", type=float, default=value)
+    p.add_argument("--json", help="Also write the report as JSON")
+    add_metric_argument(p)
+    p.set_defaults(func=cmd_validate)
+
+    p = sub.add_parser("palette", help="Print the hex palette extracted from a URL")
+    p.add_argument("url", help=".itermcolors URL, Neovim repo URL or raw file URL")
+    p.set_defaults(func=cmd_palette)
+
+    return ap
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.func(args)
@@ -0,0 +1,215 @@
+"""Color conversion: hex <-> RGB and RGB -> CIE Lab."""
+
+
+def hex_to_rgb(hexstr):
+    """#RRGGBB -> (R,G,B) tuple, None if malformed"""
+    hexstr = hexstr.strip()
+    if not hexstr.startswith("#") or len(hexstr) != 7:
+        return None
+    try:
+        return (int(hexstr[1:3], 16), int(hexstr[3:5], 16), int(hexstr[5:7], 16))
+    except ValueError:
+        return None
+
+
+def rgb_to_hex(rgb):
+    """(R,G,B) -> #RRGGBB"""
+    r, g, b = rgb
+    return f"#{r:02X}{g:02X}{b:02X}"
+
+
+def parse_hex_list(color_str):
+    """Comma-joined hex column from the colors TSVs -> list of (R,G,B)."""
+    rgbs = []
+    for c in color_str.split(","):
+        rgb = hex_to_rgb(c) if c else None
+        if rgb:
+            rgbs.append(rgb)
+    return rgbs
+
+
+def _hex_lut():
+    """ascii hex digit -> value, everything else -> 255"""
+    import numpy as np
+
+    lut = np.full(256, 255, dtype=np.uint8)
+    lut[np.frombuffer(b"0123456789abcdef", dtype=np.uint8)] = np.arange(16)
+    lut[np.frombuffer(b"ABCDEF", dtype=np.uint8)] = np.arange(10, 16)
+    return lut
+
+
+def decode_hex_buffer(buf, starts):
+    """Decode every #RRGGBB token in a comma-joined byte buffer at once.
+
+    buf holds many comma-joined color columns back to back; starts[i] is the
+    byte offset of column i. Returns (rgb, offsets): an (N, 3) uint8 array of
+    all well-formed tokens and an int array such that the colors of column
+    i are rgb[offsets[i]:offsets[i + 1]]. Malformed tokens are dropped, as
+    in parse_hex_list.
+    """
+    import numpy as np
+
+    lut = _hex_lut()
+    raw = np.frombuffer(buf, dtype=np.uint8)
+    # pad so every '#' can look 7 bytes ahead
+    data = np.concatenate([raw, np.full(8, ord(","), dtype=np.uint8)])
+    starts = np.asarray(starts, dtype=np.int64)
+    pos = np.flatnonzero(raw == ord("#"))
+
+    # a token is '#' + 6 hex digits, delimited by a comma or column edge
+    nibbles = [lut[data[pos + k]] for k in range(1, 7)]
+    edge = np.zeros(len(data), dtype=bool)
+    edge[starts] = True
+    edge[len(raw)] = True
+    ok = (
+        (np.maximum.reduce(nibbles) < 16)
+        & ((data[np.maximum(pos - 1, 0)] == ord(",")) | edge[pos])
+        & ((data[pos + 7] == ord(",")) | edge[pos + 7])
+    )
+
+    rgb = np.stack([nibbles[k] * 16 + nibbles[k + 1] for k in (0, 2, 4)], axis=1)
+    column = np.searchsorted(starts, pos[ok], side="right") - 1
+    counts = np.bincount(column, minlength=len(starts))
+    offsets = np.concatenate([[0], np.cumsum(counts)])
+    return rgb[ok], offsets
+
+
+def rgb_list_to_lab(rgb_list):
+    """Convert list of (R,G,B) to an (N, 3) Lab array (skimage, D65)"""
+    import numpy as np
+    from skimage.color import rgb2lab
+
+    arr = np.array(rgb_list, dtype=float).reshape(-1, 1, 3) / 255.0
+    return rgb2lab(arr).reshape(-1, 3)
+
+
+def _srgb_linear(rgb_list):
+    import numpy as np
+
+    c = np.asarray(rgb_list, dtype=float).reshape(-1, 3) / 255.0
+    return np.where(c <= 0.04045, c / 12.92, ((c + 0.055) / 1.055) ** 2.4)
+
+
+def rgb_list_to_oklab(rgb_list):
+    """(R,G,B) list -> (N, 3) OKLab, scaled x100 so distances read like ΔE"""
+    import numpy as np
+
+    lms = (
+        _srgb_linear(rgb_list)
+        @ np.array(
+            [
+                [0.4122214708, 0.5363325363, 0.0514459929],
+                [0.2119034982, 0.6806995451, 0.1073969566],
+                [0.0883024619, 0.2817188376, 0.6299787005],
+            ]
+        ).T
+    )
+    lab = (
+        np.cbrt(lms)
+        @ np.array(
+            [
+                [0.2104542553, 0.7936177850, -0.0040720468],
+                [1.9779984951, -2.4285922050, 0.4505937099],
+                [0.0259040371, 0.7827717662, -0.8086757660],
+            ]
+        ).T
+    )
+    return lab * 100.0
+
+
+# CAM16 viewing conditions for sRGB: D65 white, 64 lux ambient (L_A = 64/pi * 0.2),
+# 20% grey background, average surround.
+CAM16_WHITE = (95.047, 100.0, 108.883)
+CAM16_L_A = 64.0 / 3.141592653589793 * 0.2
+CAM16_Y_B = 20.0
+CAM16_F, CAM16_C, CAM16_N_C = 1.0, 0.69, 1.0
+M16 = (
+    (0.401288, 0.650173, -0.051461),
+    (-0.250268, 1.204414, 0.045854),
+    (-0.002079, 0.048952, 0.953127),
+)
+
+
+def rgb_list_to_cam16ucs(rgb_list):
+    """(R,G,B) list -> (N, 3) CAM16-UCS J'a'b'"""
+    import numpy as np
+
+    m_srgb = np.array(
+        [
+            [0.4124564, 0.3575761, 0.1804375],
+            [0.2126729, 0.7151522, 0.0721750],
+            [0.0193339, 0.1191920, 0.9503041],
+        ]
+    )
+    m16 = np.array(M16)
+    xyz = _srgb_linear(rgb_list) @ m_srgb.T * 100.0
+    xyz_w = np.array(CAM16_WHITE)
+    l_a, y_b = CAM16_L_A, CAM16_Y_B
+    y_w = xyz_w[1]
+
+    rgb_w = m16 @ xyz_w
+    d = CAM16_F * (1 - (1 / 3.6) * np.exp((-l_a - 42) / 92))
+    d = min(max(d, 0.0), 1.0)
+    d_rgb = d * y_w / rgb_w + 1 - d
+    k = 1 / (5 * l_a + 1)
+    f_l = 0.2 * k**4 * (5 * l_a) + 0.1 * (1 - k**4) ** 2 * (5 * l_a) ** (1 / 3)
+    n = y_b / y_w
+    z = 1.48 + np.sqrt(n)
+    n_bb = 0.725 * n**-0.2
+
+    def adapt(x):
+        t = (f_l * np.abs(x) / 100) ** 0.42
+        return 400 * np.sign(x) * t / (t + 27.13) + 0.1
+
+    rgb_aw = adapt(d_rgb * rgb_w)
+    a_w = (2 * rgb_aw[0] + rgb_aw[1] + rgb_aw[2] / 20 - 0.305) * n_bb
+
+    rgb_a = adapt(d_rgb * (xyz @ m16.T))
+    r, g, b = rgb_a[:, 0], rgb_a[:, 1], rgb_a[:, 2]
+    a = r - 12 * g / 11 + b / 11
+    bb = (r + g - 2 * b) / 9
+    h = np.arctan2(bb, a)
+    e_t = 0.25 * (np.cos(h + 2) + 3.8)
+    big_a = (2 * r + g + b / 20 - 0.305) * n_bb
+    j = 100 * np.clip(big_a / a_w, 0, None) ** (CAM16_C * z)
+    t = (50000 / 13 * CAM16_N_C * n_bb * e_t * np.hypot(a, bb)) / (r + g + 21 * b / 20)
+    chroma = t**0.9 * np.sqrt(j / 100) * (1.64 - 0.29**n) ** 0.73
+    m = chroma * f_l**0.25
+
+    j_ucs = 1.7 * j / (1 + 0.007 * j)
+    m_ucs = np.log1p(0.0228 * m) / 0.0228
+    return np.stack([j_ucs, m_ucs * np.cos(h), m_ucs * np.sin(h)], axis=1)
+
+
+def lab_array(labs):
+    """Lab as an (N, 3) float array, from skimage output or colormath LabColors."""
+    import numpy as np
+
+    if isinstance(labs, list) and labs and hasattr(labs[0], "lab_l"):
+        return np.array([(c.lab_l, c.lab_a, c.lab_b) for c in labs], dtype=float)
+    return np.asarray(labs, dtype=float).reshape(-1, 3)
+
+
+def _colormath():
+    import numpy as np
+
+    # colormath still calls np.asscalar, removed in numpy 1.23
+    if not hasattr(np, "asscalar"):
+        np.asscalar = lambda x: x.item()
+
+    from colormath import color_conversions, color_objects
+
+    return color_conversions, color_objects
+
+
+def rgb_to_lab(rgb):
+    """(R,G,B) -> colormath LabColor (pure-Python reference path)"""
+    color_conversions, color_objects = _colormath()
+    r, g, b = rgb
+    srgb = color_objects.sRGBColor(r, g, b, is_upscaled=True)
+    return color_conversions.convert_color(srgb, color_objects.LabColor)
+
+
+def rgb_list_to_colormath_lab(rgb_list):
+    """(R,G,B) list -> list of colormath LabColors"""
+    return [rgb_to_lab(c) for c in rgb_list]
@@ -0,0 +1,195 @@
+"""Palette distance metrics."""
+
+import math
+
+RGB_MAX_DISTANCE = 441.0  # sqrt(3 * 255**2)
+LAB_MAX_DISTANCE = 100.0
+
+
+def srgb_euclid(c1, c2):
+    # Euclidean distance in sRGB space
+    return math.sqrt(sum((a - b) ** 2 for a, b in zip(c1, c2)))
+
+
+def lab_distance(c1, c2):
+    """CIEDE2000 between two colormath LabColor objects"""
+    from colormath.color_diff import delta_e_cie2000
+
+    from colors.convert import _colormath
+
+    _colormath()
+    return delta_e_cie2000(c1, c2)
+
+
+def lab_distance_cie76(c1, c2):
+    from colormath.color_diff import delta_e_cie1976
+
+    from colors.convert import _colormath
+
+    _colormath()
+    return delta_e_cie1976(c1, c2)
+
+
+def lab_distance_cie94(c1, c2):
+    from colormath.color_diff import delta_e_cie1994
+
+    from colors.convert import _colormath
+
+    _colormath()
+    return delta_e_cie1994(c1, c2)
+
+
+# pure-Python (colormath) reference implementations, see colors.metrics
+LAB_DISTANCES = {
+    "cie76": lab_distance_cie76,
+    "cie94": lab_distance_cie94,
+    "ciede2000": lab_distance,
+}
+
+
+def avg_nearest_neighbor(p1, p2, dist_fn=srgb_euclid, w1=None):
+    # (weighted) average over p1 of the minimum distance to p2
+    if w1 is None:
+        w1 = [1.0] * len(p1)
+    total = 0.0
+    for c1, w in zip(p1, w1):
+        total += w * min(dist_fn(c1, c2) for c2 in p2)
+    return total / max(1, sum(w1))
+
+
+def symmetric_distance(p1, p2, dist_fn=srgb_euclid, w1=None, w2=None):
+    """Symmetric average nearest-neighbor distance (pure Python)"""
+    return (
+        avg_nearest_neighbor(p1, p2, dist_fn, w1)
+        + avg_nearest_neighbor(p2, p1, dist_fn, w2)
+    ) / 2.0
+
+
+def _nn_avg(dists, w=None):
+    """(Weighted) mean over rows of each row's minimum."""
+    import numpy as np
+
+    d = np.min(dists, axis=1)
+    return d.mean() if w is None else np.average(d, weights=w)
+
+
+def _nn_mean(dists, w1=None, w2=None):
+    """Symmetric mean of row/column minima, weighted by palette weights."""
+    return (_nn_avg(dists, w1) + _nn_avg(dists.T, w2)) / 2.0
+
+
+def _nn_mean_sq(sq, w1=None, w2=None):
+    """_nn_mean of sqrt(sq), rooting only the row/column minima."""
+    import numpy as np
+
+    d1 = np.sqrt(sq.min(axis=1).astype(float))
+    d2 = np.sqrt(sq.min(axis=0).astype(float))
+    a1 = d1.mean() if w1 is None else np.average(d1, weights=w1)
+    a2 = d2.mean() if w2 is None else np.average(d2, weights=w2)
+    return (a1 + a2) / 2.0
+
+
+def symmetric_distance_rgb(p1, p2, w1=None, w2=None):
+    """Symmetric average nearest-neighbor distance in sRGB
+
+    uint8 palettes take an integer path: int32 squared distances, with the
+    square root taken of the nearest-neighbor minima only. Same result as
+    the float path (the squares are exact either way), a quarter of the
+    memory traffic.
+    """
+    import numpy as np
+
+    if getattr(p1, "dtype", None) == np.uint8 == getattr(p2, "dtype", None):
+        diff = p1[:, None, :].astype(np.int32) - p2[None, :, :]
+        sq = (diff * diff).sum(axis=2)
+        return _nn_mean_sq(sq, w1, w2)
+
+    p1 = np.array(p1, dtype=float)
+    p2 = np.array(p2, dtype=float)
+    dists = np.sqrt(((p1[:, None, :] - p2[None, :, :]) ** 2).sum(axis=2))
+    return _nn_mean(dists, w1, w2)
+
+
+def pairwise_rgb(p1, p2):
+    import numpy as np
+
+    return np.sqrt(((p1[:, None, :] - p2[None, :, :]) ** 2).sum(axis=2))
+
+
+def symmetric_distance_segments(
+    c, flat, offsets, pairwise, w=None, flat_w=None, symmetric=True
+):
+    """symmetric_distance_pairwise of c against several palettes in one step.
+
+    flat is every palette concatenated; palette t is flat[offsets[t]:
+    offsets[t + 1]] (flat_w likewise holds their weights). One distance
+    matrix against all of flat is reduced per segment. Returns T scores.
+    """
+    import numpy as np
+
+    c, flat = np.asarray(c, dtype=float), np.asarray(flat, dtype=float)
+    starts = np.asarray(offsets[:-1])
+    dists = pairwise(c, flat)
+    # c -> each palette: row minima within the palette's columns
+    fwd = np.minimum.reduceat(dists, starts, axis=1)
+    fwd = fwd.mean(axis=0) if w is None else np.asarray(w) @ fwd / np.sum(w)
+    # each palette -> c: per-color minima, averaged within the segment
+    rev = dists.min(axis=0) if symmetric else pairwise(flat, c).min(axis=1)
+    if flat_w is None:
+        rev = np.add.reduceat(rev, starts) / np.diff(offsets)
+    else:
+        flat_w = np.asarray(flat_w, dtype=float)
+        rev = np.add.reduceat(rev * flat_w, starts) / np.add.reduceat(flat_w, starts)
+    return (fwd + rev) / 2.0
+
+
+def symmetric_distance_dense(c, dense, weights, pairwise, w=None, symmetric=True):
+    """symmetric_distance_pairwise of c against n fixed-shape palettes at once.
+
+    dense is an (n, S, 3) array of palettes padded to S colors and weights
+    the (n, S) weight of each slot, 0 for padding or masked slots (1.0
+    for an unweighted color). One distance tensor (len(c), n, S) is reduced
+    along fixed axes; no per-palette loop. Returns n scores.
+    """
+    import numpy as np
+
+    n, S, _ = dense.shape
+    flat = dense.reshape(n * S, 3)
+    dists = pairwise(c, flat).reshape(len(c), n, S)
+    valid = weights > 0
+    # c -> each palette: masked slots can never be the nearest color
+    fwd = np.where(valid, dists, np.inf).min(axis=2)
+    fwd = fwd.mean(axis=0) if w is None else np.asarray(w) @ fwd / np.sum(w)
+    # each palette -> c: per-slot minima, weighted mean over the valid slots
+    if symmetric:
+        rev = dists.min(axis=0)
+    else:
+        rev = pairwise(flat, c).min(axis=1).reshape(n, S)
+    rev = np.where(valid, rev * weights, 0).sum(axis=1) / weights.sum(axis=1)
+    return (fwd + rev) / 2.0
+
+
+def symmetric_distance_rgb_many(p, targets, offsets):
+    """symmetric_distance_rgb of p against several palettes in one step.
+
+    targets is every target palette concatenated, (N, 3); target t is
+    targets[offsets[t]:offsets[t + 1]]. Returns an array of T scores.
+    """
+    return symmetric_distance_segments(p, targets, offsets, pairwise_rgb)
+
+
+def symmetric_distance_pairwise(c1, c2, pairwise, w1=None, w2=None, symmetric=True):
+    """Symmetric average nearest-neighbor distance for any (n, m) kernel,
+    e.g. a metric from colors.metrics. Asymmetric kernels (CIE94 uses the
+    first color as reference) are evaluated once in each direction."""
+    import numpy as np
+
+    c1, c2 = np.asarray(c1), np.asarray(c2)
+    if symmetric:
+        return _nn_mean(pairwise(c1, c2), w1, w2)
+    return (_nn_avg(pairwise(c1, c2), w1) + _nn_avg(pairwise(c2, c1), w2)) / 2.0
+
+
+def similarity_index(score, max_distance):
+    """Distance -> [0, 1] similarity, 1 = identical"""
+    return max(0.0, min(1.0, 1 - (score / max_distance)))
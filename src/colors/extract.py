@@ -0,0 +1,686 @@
+"""Palette extraction from iTerm plists and Neovim theme sources."""
+
+import csv
+import re
+import time
+
+from colors import fetch
+from colors.blobcache import BLOB_CACHE, BlobCache
+from colors.journal import (
+    append_journal,
+    journal_path_for,
+    open_journal,
+    read_journal,
+)
+from colors.convert import hex_to_rgb, rgb_to_hex
+
+HEX_RE = re.compile(r"#(?:[0-9A-Fa-f]{6})")
+OX_RE = re.compile(r"0x([0-9A-Fa-f]{6})")
+RETRY_STATUS_RE = re.compile(r"incompatible \(API error (\d{3})\)")
+THEME_EXTS = (".lua", ".vim")
+THEME_SEGMENTS = ("color", "theme", "palette")
+# well-known palette locations in Neovim theme repos: (pattern, score)
+THEME_LAYOUTS = (
+    # lua/<name>/palette.lua, lua/<name>/colors/<variant>.lua
+    (re.compile(r"^lua/[^/]+/(?:palettes?|colou?rs?)(?:/[^/]+)?\.lua$"), 100),
+    # lua/<name>/<name>_palette.lua
+    (re.compile(r"^lua/[^/]+/[^/]*(?:palette|colou?r)[^/]*\.lua$"), 90),
+    (re.compile(r"^colors/[^/]+\.(?:vim|lua)$"), 80),
+    (re.compile(r"^lua/[^/]+/(?:themes?|variants?|flavou?rs?|styles?)/"), 70),
+    # terminal ports of the palette (kitty, alacritty, ...)
+    (re.compile(r"^extras/.+\.(?:lua|vim|conf|toml|ya?ml)$"), 30),
+)
+# directories whose files are never the theme's own palette
+SKIP_DIRS = {
+    "test",
+    "tests",
+    "spec",
+    "doc",
+    "docs",
+    "example",
+    "examples",
+    "vendor",
+    "deps",
+    "node_modules",
+    "screenshots",
+}
+# per-repo fetch limits of fetch_theme_colors
+THEME_BYTE_BUDGET = 64 * 1024
+THEME_PATIENCE = 3
+# local terminal theme formats by file extension; Ghostty themes have none
+THEME_FORMATS = {
+    ".itermcolors": "iterm",
+    "": "ghostty",
+    ".conf": "kitty",
+    ".toml": "alacritty",
+    ".yml": "alacritty",
+    ".yaml": "alacritty",
+}
+COLOR_VALUE_RE = re.compile(r"^(?:#|0x)?([0-9A-Fa-f]{6})$")
+GHOSTTY_KEYS = (
+    "background",
+    "foreground",
+    "cursor-color",
+    "cursor-text",
+    "selection-background",
+    "selection-foreground",
+)
+KITTY_KEYS = (
+    "background",
+    "foreground",
+    "cursor",
+    "cursor_text_color",
+    "selection_background",
+    "selection_foreground",
+)
+
+
+# ---------- Text ----------
+def extract_colors_from_text(text):
+    """Find hex colors (#RRGGBB and 0xRRGGBB) in file text"""
+    hexes = set(HEX_RE.findall(text))
+    for m in OX_RE.findall(text):
+        hexes.add("#" + m)
+    return sorted(hexes)
+
+
+def is_theme_file(path):
+    """.lua/.vim path mentioning color, theme or palette"""
+    path = path.lower()
+    return path.endswith(THEME_EXTS) and any(seg in path for seg in THEME_SEGMENTS)
+
+
+def theme_path_score(path):
+    """Priority of a repo path as a palette source, None to never fetch it.
+
+    Known layouts (THEME_LAYOUTS) first, then Lua/Vim files mentioning
+    color, theme or palette, then any other Lua/Vim file; deeper paths
+    rank lower. Tests, docs, vendored code and dotted dirs are skipped.
+    """
+    path = path.lower()
+    dirs = path.split("/")[:-1]
+    if any(d in SKIP_DIRS or d.startswith(".") for d in dirs):
+        return None
+    for pattern, score in THEME_LAYOUTS:
+        if pattern.match(path):
+            break
+    else:
+        if not path.endswith(THEME_EXTS):
+            return None
+        score = 50 if is_theme_file(path) else 5
+    return score - 2 * len(dirs)
+
+
+def rank_theme_files(tree):
+    """(path, size, blob sha) of the tree's candidate palette files, best first."""
+    ranked = []
+    for obj in tree:
+        if obj.get("type", "blob") != "blob":
+            continue
+        score = theme_path_score(obj.get("path", ""))
+        if score is not None:
+            ranked.append((-score, obj.get("size") or 0, obj["path"], obj.get("sha")))
+    return [(path, size, sha) for _, size, path, sha in sorted(ranked)]
+
+
+def theme_file_stream(tree, fetch_file, budget=THEME_BYTE_BUDGET, cache=None):
+    """Lazily fetch a tree's candidate palette files within budget.
+
+    Yields (size, sha, text, cached) in rank_theme_files order: text from
+    fetch_file(path), or text None and cached the hex colors when the
+    blob cache has the sha. Files that would overrun budget are skipped
+    (the first file is always read); failed fetches are dropped.
+    """
+    files = spent = 0
+    for path, size, sha in rank_theme_files(tree):
+        if files and spent + size > budget:
+            continue
+        cached = cache.get(sha) if cache is not None and sha else None
+        text = None
+        if cached is None:
+            try:
+                text = fetch_file(path)
+            except Exception:
+                continue
+        files += 1
+        spent += size
+        yield size, sha, text, cached
+        if spent >= budget:
+            return
+
+
+def palette_from_files(files, patience=THEME_PATIENCE):
+    """Fold theme_file_stream output into a palette.
+
+    Stops once patience files in a row add no new color. Returns (sorted
+    hexes, files read, bytes, fresh) where fresh are the (sha, hexes)
+    extracted here, for the blob cache.
+    """
+    hexes, n, spent, stale, fresh = set(), 0, 0, 0, []
+    for size, sha, text, cached in files:
+        found = cached
+        if found is None:
+            found = extract_colors_from_text(text)
+            # fetch_raw_file answers '' on HTTP errors; don't cache that as empty
+            if sha and (text or not size):
+                fresh.append((sha, found))
+        n += 1
+        spent += size
+        new = set(found) - hexes
+        hexes |= new
+        stale = 0 if new or not hexes else stale + 1
+        if stale >= patience:
+            break
+    return sorted(hexes), n, spent, fresh
+
+
+def fetch_theme_colors(
+    tree, fetch_file, budget=THEME_BYTE_BUDGET, patience=THEME_PATIENCE, cache=None
+):
+    """Hex colors of the best candidate files of a repo tree.
+
+    Files are fetched with fetch_file(path) in rank_theme_files order
+    until budget bytes are spent (files that would overrun it are
+    skipped; the first file is always fetched) or patience files in a row
+    add no new color. With a colors.blobcache.BlobCache, files whose blob
+    sha is cached are neither fetched nor scanned; they still count
+    against the budget, so the result does not depend on the cache.
+    Returns (sorted hexes, files read, bytes).
+    """
+    stream = theme_file_stream(tree, fetch_file, budget, cache)
+    hexes, files, spent, fresh = palette_from_files(stream, patience)
+    if cache is not None:
+        for sha, found in fresh:
+            cache.put(sha, found)
+    return hexes, files, spent
+
+
+# ---------- iTerm ----------
+def _plist_rgb(v):
+    """iTerm color dict (float 0..1 components) -> (R,G,B), else None"""
+    if not isinstance(v, dict):
+        return None
+    r = v.get("Red Component")
+    g = v.get("Green Component")
+    b = v.get("Blue Component")
+    if not (
+        isinstance(r, (int, float))
+        and isinstance(g, (int, float))
+        and isinstance(b, (int, float))
+    ):
+        return None
+    return (int(round(r * 255)), int(round(g * 255)), int(round(b * 255)))
+
+
+def parse_iterm_colors(content):
+    """.itermcolors plist bytes -> de-duplicated list of (R,G,B)"""
+    import plistlib
+
+    plist = plistlib.loads(content)
+    # iTerm files have keys like "Ansi 0 Color", each a dict with float 0..1 components
+    colors = [rgb for rgb in map(_plist_rgb, plist.values()) if rgb]
+    # de-dup, keep order
+    return list(dict.fromkeys(colors))
+
+
+def load_iterm_colors(iterm_url):
+    """Fetch and parse colors from an .itermcolors file (or a local theme file)"""
+    if iterm_url.startswith("file://"):
+        from urllib.request import url2pathname
+
+        return parse_theme_file(url2pathname(iterm_url[len("file://") :]))
+    return parse_iterm_colors(fetch.fetch_bytes(iterm_url))
+
+
+# ---------- Local theme files ----------
+def _color_value(value):
+    m = COLOR_VALUE_RE.match(value.strip().strip("'\""))
+    return hex_to_rgb("#" + m.group(1)) if m else None
+
+
+def parse_ghostty_theme(text):
+    """Ghostty theme (palette = N=#hex, background = #hex, ...) -> list of (R,G,B)"""
+    colors = []
+    for line in text.splitlines():
+        key, _, value = line.partition("=")
+        key = key.strip()
+        if key == "palette":
+            value = value.partition("=")[2]
+        elif key not in GHOSTTY_KEYS:
+            continue
+        rgb = _color_value(value)
+        if rgb:
+            colors.append(rgb)
+    return list(dict.fromkeys(colors))
+
+
+def parse_kitty_conf(text):
+    """kitty theme (colorN #hex, background #hex, ...) -> list of (R,G,B)"""
+    colors = []
+    for line in text.splitlines():
+        parts = line.split()
+        if len(parts) != 2:
+            continue
+        key, value = parts
+        if key in KITTY_KEYS or (key.startswith("color") and key[5:].isdigit()):
+            rgb = _color_value(value)
+            if rgb:
+                colors.append(rgb)
+    return list(dict.fromkeys(colors))
+
+
+def parse_alacritty_theme(text):
+    """alacritty TOML/YAML theme (key = "#hex" / key: '0xhex') -> list of (R,G,B)"""
+    colors = []
+    for line in text.splitlines():
+        line = line.strip()
+        if line.startswith("#"):
+            continue
+        for sep in ("=", ":"):
+            key, found, value = line.partition(sep)
+            if found:
+                rgb = _color_value(value)
+                if rgb:
+                    colors.append(rgb)
+                break
+    return list(dict.fromkeys(colors))
+
+
+def theme_format(path):
+    """Local theme format for path by extension, or None."""
+    import os
+
+    name = os.path.basename(path)
+    if name.startswith("."):
+        return None
+    return THEME_FORMATS.get(os.path.splitext(name)[1].lower())
+
+
+def parse_theme_file(path):
+    """Colors of a local iTerm, Ghostty, kitty or alacritty theme file."""
+    fmt = theme_format(path)
+    with open(path, "rb") as f:
+        content = f.read()
+    if fmt == "iterm":
+        return parse_iterm_colors(content)
+    text = content.decode("utf-8", errors="replace")
+    if fmt == "ghostty":
+        return parse_ghostty_theme(text)
+    if fmt == "kitty":
+        return parse_kitty_conf(text)
+    if fmt == "alacritty":
+        return parse_alacritty_theme(text)
+    return []
+
+
+# ---------- Neovim ----------
+def load_nvim_colors(nvim_url, cache=None):
+    """Colors of a Neovim theme given a repo URL, a GitHub file URL or any text URL.
+
+    cache is an optional colors.blobcache.BlobCache for repo files.
+    """
+    if fetch.is_github_repo_url(nvim_url):
+        # rank the repo's files and fetch the likeliest palette sources
+        owner, repo = fetch.repo_owner_name(nvim_url)
+        meta = fetch.repo_metadata(owner, repo)
+        if "error" in meta:
+            raise RuntimeError(f"{owner}/{repo}: {meta['error']}")
+        # pin to the HEAD commit when known; one fewer lookup per file
+        branch = meta.get("head_sha") or meta.get("default_branch") or "main"
+        tree = fetch.github_tree(owner, repo, branch)
+        base = f"{fetch.GITHUB_RAW}/{owner}/{repo}/{branch}"
+        hexes, files, _ = fetch_theme_colors(
+            tree, lambda p: fetch.fetch_text(f"{base}/{p}"), cache=cache
+        )
+        if not files:
+            raise RuntimeError("Could not fetch any theme files from repo.")
+    else:
+        # GitHub file or generic URL: just try to pull text and parse hexes
+        hexes = extract_colors_from_text(fetch.fetch_text(nvim_url))
+
+    colors = []
+    for h in sorted(hexes):
+        rgb = hex_to_rgb(h)
+        if rgb:
+            colors.append(rgb)
+    return list(dict.fromkeys(colors))
+
+
+def repo_extract_colors(owner, repo, ref="HEAD", cache=None):
+    """Scan repo for theme files and extract colors (cache: a BlobCache)"""
+    tree, err = fetch.get_repo_tree(owner, repo, ref)
+    if tree is None:
+        return [], err
+    hexes, files, spent = fetch_theme_colors(
+        tree, lambda p: fetch.fetch_raw_file(owner, repo, p, ref), cache=cache
+    )
+    if hexes:
+        return hexes, "theme file found"
+    return [], _no_palette_reason(files, spent)
+
+
+def _no_palette_reason(files, spent):
+    if files:
+        return f"no colors in {files} candidate files ({spent // 1024} KB)"
+    return "no theme files"
+
+
+# ---------- Harvest ----------
+def read_name_urls(csv_path):
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        return [(row["name"], row["url"]) for row in csv.DictReader(f)]
+
+
+def write_tsv(out_path, header, rows):
+    with open(out_path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f, delimiter="\t")
+        writer.writerow(header)
+        writer.writerows(rows)
+
+
+def _resume_journal(journal, entries, resume, failed=None):
+    """url -> row of journaled results to keep; rows failed(row) says
+    errored (rate limits, network) are dropped so the run retries them."""
+    done = read_journal(journal) if resume else {}
+    retry = [url for url, row in done.items() if failed and failed(row)]
+    for url in retry:
+        del done[url]
+    if done or retry:
+        print(
+            f"Resuming: {len(done)} of {len(entries)} already in {journal}, "
+            f"retrying {len(retry)} failed"
+        )
+    return done
+
+
+def _harvest(
+    csv_path, out_path, header, harvest_one, resume, journal, delay=0, failed=None
+):
+    """Run harvest_one(name, url) -> row for every CSV entry via the journal.
+
+    Each finished row is appended to the journal immediately; with resume,
+    urls already journaled are skipped unless failed(row) is true. The
+    TSV is compacted from the journal at the end, in CSV order.
+    """
+    journal = journal or journal_path_for(out_path)
+    entries = read_name_urls(csv_path)
+    done = _resume_journal(journal, entries, resume, failed)
+
+    with open_journal(journal, resume=resume) as jf:
+        for name, url in entries:
+            if url in done:
+                continue
+            row, fetched = harvest_one(name, url)
+            append_journal(jf, row)
+            done[url] = row
+            if fetched and delay:
+                time.sleep(delay)
+
+    results = [done[url] for _, url in entries if url in done]
+    write_tsv(out_path, header, results)
+    return results
+
+
+def _iterm_failed(row):
+    # _harvest_iterm_one's error row has no colors
+    return not row[2]
+
+
+def _nvim_failed(row):
+    # tree listing hit a rate limit (403/429) or a server error: worth
+    # another try; a 404 or 409 (empty repo) stays final
+    m = RETRY_STATUS_RE.fullmatch(row[2])
+    return bool(m) and (m.group(1) in ("403", "429") or m.group(1)[0] == "5")
+
+
+def _harvest_iterm_one(name, url):
+    try:
+        colors = [rgb_to_hex(c) for c in load_iterm_colors(url)]
+        print(f"{name}: {len(colors)} colors")
+        return (name, url, ",".join(colors)), True
+    except Exception as e:
+        print(f"Skipping {name} ({url}) due to error: {e}")
+        return (name, url, ""), True
+
+
+def _nvim_row(name, url, colors, reason):
+    status = "compatible" if colors else f"incompatible ({reason})"
+    print(f"{name}: {url} -> {status}, {len(colors)} colors found")
+    return (name, url, status, ",".join(colors))
+
+
+def _harvest_nvim_one(name, url, cache=None):
+    if not fetch.is_github_repo_url(url):
+        print(f"{name}: {url} -> invalid_repo_url")
+        return (name, url, "invalid_repo_url", ""), False
+
+    owner, repo = fetch.repo_owner_name(url)
+    ref = "HEAD"
+    if fetch.github_token():
+        # batch-resolved up front by harvest_nvim
+        ref = fetch.repo_ref(owner, repo)
+    colors, reason = repo_extract_colors(owner, repo, ref, cache)
+    return _nvim_row(name, url, colors, reason), True
+
+
+def _fetch_nvim_repo(entry, cache=None):
+    """Pipeline fetch stage: (name, url, palette_from_files result or None, error)
+
+    Files are fetched in score order and folded into the palette as they
+    arrive, so fetching stops where palette_from_files stops (patience)
+    and the pipeline makes the same requests as the serial harvest.
+    """
+    from functools import partial
+
+    name, url = entry
+    if not fetch.is_github_repo_url(url):
+        return name, url, None, "invalid_repo_url"
+    owner, repo = fetch.repo_owner_name(url)
+    ref = fetch.repo_ref(owner, repo) if fetch.github_token() else "HEAD"
+    tree, err = fetch.get_repo_tree(owner, repo, ref)
+    if tree is None:
+        return name, url, None, err
+    fetch_file = partial(fetch.fetch_raw_file, owner, repo, ref=ref)
+    stream = theme_file_stream(tree, fetch_file, cache=cache)
+    return name, url, palette_from_files(stream), None
+
+
+def _extract_nvim_repo(payload):
+    """Pipeline extract stage: (name, url, hexes, reason, fresh cache entries)"""
+    name, url, palette, err = payload
+    if palette is None:
+        return name, url, [], err, []
+    hexes, n, spent, fresh = palette
+    reason = "theme file found" if hexes else _no_palette_reason(n, spent)
+    return name, url, hexes, reason, fresh
+
+
+def harvest_iterm(csv_path, out_path, resume=False, journal=None):
+    """name,url CSV of .itermcolors files -> name,url,colors TSV"""
+    return _harvest(
+        csv_path,
+        out_path,
+        ["name", "url", "colors"],
+        _harvest_iterm_one,
+        resume,
+        journal,
+        failed=_iterm_failed,
+    )
+
+
+def _ingest_one(path):
+    try:
+        return [rgb_to_hex(c) for c in parse_theme_file(path)]
+    except Exception as e:
+        print(f"Skipping {path} due to error: {e}")
+        return []
+
+
+def local_theme_files(root):
+    """(name, format, path) for every theme file under root.
+
+    When the same scheme exists in several formats (as in an
+    iTerm2-Color-Schemes clone) only the first of THEME_FORMATS is kept.
+    """
+    import os
+
+    rank = {fmt: i for i, fmt in enumerate(dict.fromkeys(THEME_FORMATS.values()))}
+    best = {}
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+        for fn in sorted(filenames):
+            fmt = theme_format(fn)
+            if fmt is None:
+                continue
+            name = fn[: len(fn) - len(os.path.splitext(fn)[1])]
+            if name not in best or rank[fmt] < rank[best[name][0]]:
+                best[name] = (fmt, os.path.join(dirpath, fn))
+    return [(name, fmt, path) for name, (fmt, path) in sorted(best.items())]
+
+
+def harvest_theme_dir(root, out_path, workers=None):
+    """Local theme directory -> the same name,url,colors TSV as harvest_iterm.
+
+    Files are parsed in a process pool; url is the file:// URI, which
+    load_iterm_colors also accepts.
+    """
+    import os
+    from pathlib import Path
+
+    files = local_theme_files(root)
+    paths = [path for _, _, path in files]
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(paths) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        chunksize = max(1, len(paths) // (workers * 4))
+        with ProcessPoolExecutor(workers) as ex:
+            colors = list(ex.map(_ingest_one, paths, chunksize=chunksize))
+    else:
+        colors = [_ingest_one(p) for p in paths]
+
+    rows = [
+        (name, Path(path).resolve().as_uri(), ",".join(hexes))
+        for (name, _, path), hexes in zip(files, colors)
+        if hexes
+    ]
+    write_tsv(out_path, ("name", "url", "colors"), rows)
+    print(f"Saved {len(rows)} themes from {root} to {out_path}")
+    return rows
+
+
+def _harvest_pipelined(
+    csv_path,
+    out_path,
+    header,
+    fetch_one,
+    extract_one,
+    write_one,
+    resume,
+    journal,
+    failed=None,
+    **kw,
+):
+    """_harvest as a colors.pipeline run: fetch_one(entry) in threads,
+    extract_one(payload) in processes, write_one(result) -> row in this
+    thread. Same journal, resume and CSV-order compaction."""
+    from colors.pipeline import run_pipeline
+
+    journal = journal or journal_path_for(out_path)
+    entries = read_name_urls(csv_path)
+    done = _resume_journal(journal, entries, resume, failed)
+    todo = {}
+    for name, url in entries:
+        if url not in done:
+            todo.setdefault(url, (name, url))
+
+    with open_journal(journal, resume=resume) as jf:
+
+        def write(result):
+            row = write_one(result)
+            append_journal(jf, row)
+            done[row[1]] = row
+
+        run_pipeline(todo.values(), fetch_one, extract_one, write, **kw)
+
+    results = [done[url] for _, url in entries if url in done]
+    write_tsv(out_path, header, results)
+    return results
+
+
+def harvest_nvim(
+    csv_path,
+    out_path,
+    delay=0.5,
+    resume=False,
+    journal=None,
+    blob_cache=BLOB_CACHE,
+    fetchers=0,
+    extractors=None,
+    refresh_meta=False,
+):
+    """name,url CSV of Neovim repos -> name,url,status,colors TSV
+
+    Colors extracted from each file are cached by blob sha in blob_cache
+    (None disables it), so forks and re-runs skip files already seen.
+    With fetchers, repos are harvested as a pipeline (colors.pipeline):
+    that many threads fetch trees and files and scan each file as it
+    arrives (so the patience stop ends a repo's fetching), extractors
+    processes classify the results, and this thread writes; delay is not
+    applied. Otherwise one
+    repo at a time, delay seconds apart. refresh_meta re-resolves every
+    repo's HEAD sha instead of trusting the cached ones (see
+    fetch.META_TTL).
+    """
+    from functools import partial
+
+    if fetch.github_token():
+        # HEAD shas for every repo in a few GraphQL calls instead of one each
+        repos = [
+            fetch.repo_owner_name(url)
+            for _, url in read_name_urls(csv_path)
+            if fetch.is_github_repo_url(url)
+        ]
+        fetch.resolve_repo_metadata(repos, refresh=refresh_meta)
+    header = ["name", "url", "status", "colors"]
+    cache = BlobCache(blob_cache) if blob_cache else None
+
+    def write_one(result):
+        name, url, hexes, reason, fresh = result
+        if cache is not None:
+            for sha, found in fresh:
+                cache.put(sha, found)
+        if reason == "invalid_repo_url":
+            print(f"{name}: {url} -> invalid_repo_url")
+            return (name, url, "invalid_repo_url", "")
+        return _nvim_row(name, url, hexes, reason)
+
+    try:
+        if fetchers:
+            return _harvest_pipelined(
+                csv_path,
+                out_path,
+                header,
+                partial(_fetch_nvim_repo, cache=cache),
+                _extract_nvim_repo,
+                write_one,
+                resume,
+                journal,
+                failed=_nvim_failed,
+                fetchers=fetchers,
+                extractors=extractors,
+            )
+        return _harvest(
+            csv_path,
+            out_path,
+            header,
+            partial(_harvest_nvim_one, cache=cache),
+            resume,
+            journal,
+            delay=delay,
+            failed=_nvim_failed,
+        )
+    finally:
+        if cache is not None:
+            print(f"Blob cache: {cache.hits} files reused, {cache.misses} fetched")
+            cache.close()
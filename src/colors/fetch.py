@@ -0,0 +1,413 @@
+"""Network access: GitHub API, raw files and theme URL discovery."""
+
+import csv
+import json
+import os
+import threading
+import time
+from urllib.parse import urlparse
+
+# overridable so a stub server can stand in for GitHub
+GITHUB_API = os.getenv("GITHUB_API_URL", "https://api.github.com")
+GITHUB_RAW = os.getenv("GITHUB_RAW_URL", "https://raw.githubusercontent.com")
+GITHUB_GRAPHQL = f"{GITHUB_API}/graphql"
+META_CACHE = "../data/interim/github_meta.json"
+# cached HEAD shas older than this are resolved again, so theme updates land
+META_TTL = 24 * 3600
+ITERM_REPO = "mbadolato/iTerm2-Color-Schemes"
+ITERM_RAW = f"{GITHUB_RAW}/{ITERM_REPO}/master"
+ITERM_TREE = f"{GITHUB_API}/repos/{ITERM_REPO}/git/trees/master?recursive=1"
+NVIM_TOPIC_URL = "https://github.com/topics/neovim-colorscheme"
+NVIM_TOPICS = ("neovim-colorscheme", "vim-colorscheme", "nvim-theme")
+SEARCH_PER_PAGE = 100
+SEARCH_MAX_RESULTS = 1000  # the search API never pages past this
+
+_session = None
+
+
+def session():
+    """Shared requests.Session so every fetch reuses pooled connections."""
+    global _session
+    if _session is None:
+        import requests
+
+        _session = requests.Session()
+    return _session
+
+
+_dotenv_loaded = False
+_pool = None
+
+
+def _getenv(name):
+    """Environment variable, falling back to a .env file once."""
+    global _dotenv_loaded
+    value = os.getenv(name)
+    if value or _dotenv_loaded:
+        return value
+    _dotenv_loaded = True
+    try:
+        from dotenv import load_dotenv
+    except ImportError:
+        return None
+    load_dotenv()
+    return os.getenv(name)
+
+
+def github_tokens():
+    """Every token in GITHUB_TOKENS (comma or space separated) and GITHUB_TOKEN."""
+    tokens = (_getenv("GITHUB_TOKENS") or "").replace(",", " ").split()
+    tokens.append(_getenv("GITHUB_TOKEN"))
+    return list(dict.fromkeys(t for t in tokens if t))
+
+
+def github_token():
+    """First configured token, or None when running unauthenticated."""
+    tokens = github_tokens()
+    return tokens[0] if tokens else None
+
+
+def token_pool():
+    """Shared TokenPool over every configured token."""
+    global _pool
+    if _pool is None:
+        from .tokens import TokenPool
+
+        _pool = TokenPool(github_tokens())
+    return _pool
+
+
+def github_request(method, url, resource="core", timeout=30, **kwargs):
+    """GitHub API call through the token pool.
+
+    Uses the token with the most remaining quota and records the rate-limit
+    headers of every response. A rate-limited response benches that token
+    and the call is retried on another, parking until a reset if needed.
+    """
+    from .tokens import is_rate_limited
+
+    pool = token_pool()
+    while True:
+        token = pool.acquire(resource)
+        headers = {"Authorization": f"token {token}"} if token else {}
+        r = session().request(method, url, headers=headers, timeout=timeout, **kwargs)
+        pool.update(token, r.headers, resource)
+        if not is_rate_limited(r):
+            return r
+
+
+# ---------- URLs ----------
+def is_github_repo_url(url):
+    """Check if the URL looks like github.com/owner/repo"""
+    u = urlparse(url)
+    parts = [p for p in u.path.split("/") if p]
+    return u.netloc == "github.com" and len(parts) == 2
+
+
+def repo_owner_name(url):
+    """github.com/owner/repo -> (owner, repo)"""
+    owner, repo = [p for p in urlparse(url).path.split("/") if p]
+    return owner, repo
+
+
+# ---------- GitHub ----------
+def github_tree(owner, repo, branch="HEAD"):
+    """Recursive tree listing; raises on HTTP errors."""
+    api = f"{GITHUB_API}/repos/{owner}/{repo}/git/trees/{branch}?recursive=1"
+    r = github_request("GET", api, timeout=30)
+    r.raise_for_status()
+    return r.json().get("tree", [])
+
+
+def get_repo_tree(owner, repo, branch="HEAD"):
+    """Recursive tree listing as (tree, error) instead of raising."""
+    api = f"{GITHUB_API}/repos/{owner}/{repo}/git/trees/{branch}?recursive=1"
+    r = github_request("GET", api, timeout=20)
+    if r.status_code != 200:
+        return None, f"API error {r.status_code}"
+    return r.json().get("tree", []), None
+
+
+# ---------- Repo metadata ----------
+_REPO_FIELDS = """
+    databaseId
+    isArchived
+    isFork
+    defaultBranchRef { name target { oid } }
+    object(expression: "HEAD:") {
+      ... on Tree { entries { name type oid object { ... on Blob { byteSize } } } }
+    }
+"""
+
+_meta_caches = {}  # cache_path -> {"owner/repo": meta}
+_meta_lock = threading.Lock()  # pipelined harvests resolve refs from threads
+
+
+def _graphql_metadata(repos):
+    """One GraphQL request for up to 100 (owner, repo) pairs -> {key: meta}"""
+    parts = []
+    for i, (owner, repo) in enumerate(repos):
+        parts.append(
+            f"r{i}: repository(owner: {json.dumps(owner)}, name: {json.dumps(repo)})"
+            f" {{{_REPO_FIELDS}}}"
+        )
+    query = "query {\n" + "\n".join(parts) + "\n}"
+    r = github_request(
+        "POST", GITHUB_GRAPHQL, resource="graphql", timeout=60, json={"query": query}
+    )
+    r.raise_for_status()
+    body = r.json()
+    data = body.get("data") or {}
+    # a null node is "not found" only if its error says so; rate limits and
+    # timeouts null the node (or all of data) too
+    missing = {
+        e["path"][0]: e.get("type") or e.get("message", "error")
+        for e in body.get("errors") or []
+        if e.get("path")
+    }
+    fallback = (body.get("errors") or [{}])[0].get("type", "no data")
+
+    out = {}
+    for i, (owner, repo) in enumerate(repos):
+        node = data.get(f"r{i}")
+        if node is None:
+            reason = missing.get(f"r{i}", fallback)
+            out[f"{owner}/{repo}"] = {
+                "error": "not found" if reason == "NOT_FOUND" else reason
+            }
+            continue
+        branch = node.get("defaultBranchRef") or {}
+        tree = node.get("object") or {}
+        out[f"{owner}/{repo}"] = {
+            "id": node.get("databaseId"),
+            "default_branch": branch.get("name"),
+            "head_sha": (branch.get("target") or {}).get("oid"),
+            "archived": node.get("isArchived"),
+            "fork": node.get("isFork"),
+            "root_entries": [
+                {
+                    "path": e["name"],
+                    "type": e["type"],
+                    "sha": e["oid"],
+                    "size": (e.get("object") or {}).get("byteSize"),
+                }
+                for e in tree.get("entries", [])
+            ],
+        }
+    return out
+
+
+def _rest_metadata(owner, repo):
+    """Unauthenticated fallback: REST repo call (no HEAD sha or root listing)."""
+    api = f"{GITHUB_API}/repos/{owner}/{repo}"
+    r = github_request("GET", api, timeout=30)
+    if r.status_code == 404:
+        return {"error": "not found"}
+    if r.status_code != 200:
+        return {"error": f"API error {r.status_code}"}
+    j = r.json()
+    return {
+        "id": j.get("id"),
+        "default_branch": j.get("default_branch", "main"),
+        "head_sha": None,
+        "archived": j.get("archived"),
+        "fork": j.get("fork"),
+        "root_entries": None,
+    }
+
+
+def _load_meta_cache(cache_path):
+    if cache_path not in _meta_caches:
+        try:
+            with open(cache_path, encoding="utf-8") as f:
+                _meta_caches[cache_path] = json.load(f)
+        except (OSError, ValueError):
+            _meta_caches[cache_path] = {}
+    return _meta_caches[cache_path]
+
+
+def _save_meta_cache(cache_path, cache):
+    os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+    tmp = f"{cache_path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(cache, f)
+    os.replace(tmp, cache_path)
+
+
+def _meta_fresh(meta, now, max_age):
+    return meta is not None and now - meta.get("fetched_at", 0) < max_age
+
+
+def resolve_repo_metadata(
+    repos, cache_path=META_CACHE, batch_size=100, refresh=False, max_age=META_TTL
+):
+    """Default branch, HEAD sha, archived/fork flags and root tree entries.
+
+    repos is an iterable of (owner, repo). With a token, repos not cached
+    in the last max_age seconds (all of them with refresh) are resolved
+    through GraphQL, batch_size repos per request; without one, one REST
+    call each. Results are cached in cache_path and returned as
+    {"owner/repo": meta}; failed lookups carry an "error" key. Only "not
+    found" errors are cached (and expire like the rest); other failures
+    (rate limits, timeouts) are retried by the next call.
+    """
+    repos = list(dict.fromkeys(repos))
+    with _meta_lock:
+        cache = _load_meta_cache(cache_path)
+        now = time.time()
+        keys = {r: f"{r[0]}/{r[1]}" for r in repos}
+        out = {
+            keys[r]: cache[keys[r]]
+            for r in repos
+            if not refresh and _meta_fresh(cache.get(keys[r]), now, max_age)
+        }
+        todo = [r for r in repos if keys[r] not in out]
+        if not todo:
+            return out
+        if github_token():
+            for i in range(0, len(todo), batch_size):
+                out.update(_graphql_metadata(todo[i : i + batch_size]))
+        else:
+            for owner, repo in todo:
+                out[f"{owner}/{repo}"] = _rest_metadata(owner, repo)
+        for r in todo:
+            meta = out[keys[r]]
+            if meta.get("error", "not found") == "not found":
+                meta["fetched_at"] = now
+                cache[keys[r]] = meta
+        _save_meta_cache(cache_path, cache)
+    return {keys[r]: out[keys[r]] for r in repos}
+
+
+def repo_metadata(owner, repo):
+    return resolve_repo_metadata([(owner, repo)])[f"{owner}/{repo}"]
+
+
+def repo_ref(owner, repo):
+    """Best ref to read a repo at: the cached HEAD sha, else HEAD."""
+    meta = repo_metadata(owner, repo)
+    return meta.get("head_sha") or "HEAD"
+
+
+def fetch_raw_file(owner, repo, path, branch="HEAD"):
+    """Fetch raw file text from GitHub repo, '' on any HTTP error"""
+    raw_url = f"{GITHUB_RAW}/{owner}/{repo}/{branch}/{path}"
+    r = session().get(raw_url, timeout=20)
+    if r.status_code == 200:
+        return r.text
+    return ""
+
+
+def fetch_bytes(url):
+    r = session().get(url, timeout=30)
+    r.raise_for_status()
+    return r.content
+
+
+def fetch_text(url):
+    r = session().get(url, timeout=30)
+    if r.status_code == 404 and "/blob/" in url:
+        # convert blob -> raw
+        url = url.replace("https://github.com/", f"{GITHUB_RAW}/").replace(
+            "/blob/", "/"
+        )
+        r = session().get(url, timeout=30)
+    r.raise_for_status()
+    return r.text
+
+
+# ---------- Discovery ----------
+def write_name_url_csv(path, themes):
+    """Write (name, url) rows as they arrive; returns the row count."""
+    n = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["name", "url"])
+        for row in themes:
+            writer.writerow(row)
+            n += 1
+    return n
+
+
+def fetch_iterm_scheme_urls():
+    """(name, url) for every .itermcolors file in the iTerm2-Color-Schemes repo."""
+    r = github_request("GET", ITERM_TREE, timeout=30)
+    r.raise_for_status()
+    themes = []
+    for obj in r.json().get("tree", []):
+        path = obj.get("path", "")
+        # We look for .itermcolors files under schemes/
+        if path.startswith("schemes/") and path.endswith(".itermcolors"):
+            name = path.split("/")[-1].replace(".itermcolors", "")
+            themes.append((name, f"{ITERM_RAW}/{path}"))
+    return themes
+
+
+def _search_page(query, page):
+    r = github_request(
+        "GET",
+        f"{GITHUB_API}/search/repositories",
+        resource="search",
+        params={"q": query, "per_page": SEARCH_PER_PAGE, "page": page},
+    )
+    r.raise_for_status()
+    return r.json()
+
+
+def search_topic_repos(topics=NVIM_TOPICS, workers=8):
+    """Yield (name, url) for repos tagged with any of topics, deduped by repo id.
+
+    The first search page of each topic gives its total_count; the rest of
+    its pages are then fetched concurrently, and rows are yielded as pages
+    complete. Each topic is capped at the search API's 1000 results.
+    """
+    from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+    seen = set()
+    with ThreadPoolExecutor(workers) as ex:
+        pending = {ex.submit(_search_page, f"topic:{t}", 1): (t, 1) for t in topics}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                topic, page = pending.pop(fut)
+                res = fut.result()
+                if page == 1:
+                    total = min(res.get("total_count", 0), SEARCH_MAX_RESULTS)
+                    last = -(-total // SEARCH_PER_PAGE)
+                    for p in range(2, last + 1):
+                        q = f"topic:{topic}"
+                        pending[ex.submit(_search_page, q, p)] = (topic, p)
+                for item in res.get("items", []):
+                    if item["id"] in seen:
+                        continue
+                    seen.add(item["id"])
+                    # bare repo name like the topic-page scraper; the url
+                    # carries the owner
+                    yield item["name"], item["html_url"]
+
+
+def scrape_nvim_topic(url=NVIM_TOPIC_URL):
+    """(name, url) for every repo on a GitHub topic page, via headless Chromium."""
+    from playwright.sync_api import sync_playwright
+
+    themes = []
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True)
+        page = browser.new_page()
+        page.goto(url)
+
+        # Keep clicking "Load more" until it's gone
+        while page.locator("text=Load more").is_visible():
+            page.locator("text=Load more").click()
+            page.wait_for_timeout(1500)  # wait for new repos to load
+
+        # Extract repo links
+        repo_links = page.locator("article h3 a")
+        count = repo_links.count()
+        for i in range(count):
+            name = repo_links.nth(i).inner_text().strip()
+            href = "https://github.com" + repo_links.nth(i).get_attribute("href")
+            themes.append((name, href))
+
+        browser.close()
+    return themes
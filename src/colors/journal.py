@@ -0,0 +1,42 @@
+"""Append-only JSONL journal so long harvests survive crashes and resume."""
+
+import json
+import os
+
+
+def journal_path_for(out_path):
+    return f"{out_path}.journal.jsonl"
+
+
+def read_journal(path):
+    """url -> row for every complete line; a torn last line is ignored."""
+    done = {}
+    try:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    continue
+                done[row[1]] = row
+    except FileNotFoundError:
+        pass
+    return done
+
+
+def open_journal(path, resume=False):
+    """Journal file handle; truncated unless resuming."""
+    if resume and os.path.exists(path):
+        # drop a torn trailing line so new entries start on their own line
+        with open(path, "rb+") as f:
+            data = f.read()
+            if data and not data.endswith(b"\n"):
+                f.truncate(data.rfind(b"\n") + 1)
+    return open(path, "a" if resume else "w", encoding="utf-8")
+
+
+def append_journal(f, row):
+    """Write one finished result and push it to disk before moving on."""
+    f.write(json.dumps(list(row), ensure_ascii=False) + "\n")
+    f.flush()
+    os.fsync(f.fileno())
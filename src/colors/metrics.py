@@ -0,0 +1,95 @@
+"""Registry of color-difference metrics with vectorized pairwise kernels.
+
+Each metric names the color space it works in (the function that turns a
+list of (R,G,B) into coordinates), a pairwise kernel returning the full
+(n, m) distance matrix for two palettes, and the distance that maps to a
+similarity index of 0. Euclidean metrics use one matrix multiply
+(|a|^2 + |b|^2 - 2ab^T), which is the fast path for bulk screening;
+ciede2000 stays the default for final ranking.
+"""
+
+from collections import namedtuple
+
+Metric = namedtuple(
+    "Metric", ["name", "to_coords", "pairwise", "max_distance", "symmetric"]
+)
+
+DEFAULT_METRIC = "ciede2000"
+
+# float32: float32 coordinates and kernels, uint8 RGB with integer distances
+PRECISIONS = ("float64", "float32")
+DEFAULT_PRECISION = "float64"
+
+
+def pairwise_euclid(c1, c2):
+    """(n, m) Euclidean distances via a single GEMM (float32 stays float32)"""
+    import numpy as np
+
+    dtype = np.result_type(np.asarray(c1).dtype, np.asarray(c2).dtype, np.float32)
+    c1 = np.asarray(c1, dtype=dtype)
+    c2 = np.asarray(c2, dtype=dtype)
+    sq = (c1**2).sum(axis=1)[:, None] + (c2**2).sum(axis=1)[None, :] - 2 * c1 @ c2.T
+    return np.sqrt(np.maximum(sq, 0.0))
+
+
+def pairwise_cie94(lab1, lab2):
+    from skimage.color import deltaE_ciede94
+
+    return deltaE_ciede94(lab1[:, None, :], lab2[None, :, :])
+
+
+def pairwise_ciede2000(lab1, lab2):
+    from skimage.color import deltaE_ciede2000
+
+    return deltaE_ciede2000(lab1[:, None, :], lab2[None, :, :])
+
+
+def _lab(rgbs):
+    from colors.convert import rgb_list_to_lab
+
+    return rgb_list_to_lab(rgbs)
+
+
+def _oklab(rgbs):
+    from colors.convert import rgb_list_to_oklab
+
+    return rgb_list_to_oklab(rgbs)
+
+
+def _cam16ucs(rgbs):
+    from colors.convert import rgb_list_to_cam16ucs
+
+    return rgb_list_to_cam16ucs(rgbs)
+
+
+METRICS = {
+    "cie76": Metric("cie76", _lab, pairwise_euclid, 100.0, True),
+    "cie94": Metric("cie94", _lab, pairwise_cie94, 100.0, False),
+    "ciede2000": Metric("ciede2000", _lab, pairwise_ciede2000, 100.0, True),
+    "oklab": Metric("oklab", _oklab, pairwise_euclid, 100.0, True),
+    "cam16ucs": Metric("cam16ucs", _cam16ucs, pairwise_euclid, 100.0, True),
+}
+
+
+def get_metric(name):
+    try:
+        return METRICS[name]
+    except KeyError:
+        raise ValueError(
+            f"unknown metric {name!r}; choose from {', '.join(METRICS)}"
+        ) from None
+
+
+def coords_dtype(precision):
+    import numpy as np
+
+    if precision not in PRECISIONS:
+        raise ValueError(
+            f"unknown precision {precision!r}; choose from {', '.join(PRECISIONS)}"
+        )
+    return np.float32 if precision == "float32" else np.float64
+
+
+def column_suffix(name):
+    """Output column suffix: 'lab' for the default so existing readers keep working."""
+    return "lab" if name == DEFAULT_METRIC else name
@@ -0,0 +1,157 @@
+"""Staged fetch -> extract -> write pipeline with bounded queues.
+
+Fetcher threads (network-bound) feed a bounded queue; a process pool
+runs the CPU-bound extraction; the calling thread writes results as they
+come. Every hand-off is a bounded queue, so a slow stage blocks the one
+before it (backpressure) and memory stays at about 2 * depth items.
+Per-stage counters tell which stage the run was bound by.
+"""
+
+import queue
+import threading
+import time
+
+DONE = object()
+
+
+class StageStats:
+    """Items, busy seconds and seconds blocked on a full queue for one stage."""
+
+    def __init__(self, name, workers):
+        self.name = name
+        self.workers = workers
+        self.items = 0
+        self.busy = 0.0
+        self.blocked = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, busy=0.0, blocked=0.0, items=1):
+        with self._lock:
+            self.items += items
+            self.busy += busy
+            self.blocked += blocked
+
+    def utilization(self, wall):
+        return self.busy / (wall * self.workers) if wall else 0.0
+
+    def line(self, wall):
+        rate = self.items / wall if wall else 0.0
+        return (
+            f"{self.name}: {self.items} ({rate:.1f}/s), "
+            f"{self.utilization(wall):.0%} busy x{self.workers}, "
+            f"blocked {self.blocked:.1f}s"
+        )
+
+
+def _timed_call(fn, arg):
+    start = time.perf_counter()
+    return fn(arg), time.perf_counter() - start
+
+
+def _put(q, item, stats):
+    start = time.perf_counter()
+    q.put(item)
+    stats.add(blocked=time.perf_counter() - start, items=0)
+
+
+def run_pipeline(
+    items, fetch, extract, write, fetchers=8, extractors=None, depth=32, every=10.0
+):
+    """fetch(item) in threads -> extract(payload) in processes -> write(result).
+
+    extract must be picklable (a module-level function or a partial of
+    one). Results are written in completion order. Prints the per-stage
+    counters every `every` seconds and at the end; returns the stats.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    from colors.schedule import pool_size
+
+    extractors = pool_size(extractors)
+    stats = {
+        "fetch": StageStats("fetch", fetchers),
+        "extract": StageStats("extract", extractors),
+        "write": StageStats("write", 1),
+    }
+    fetched = queue.Queue(maxsize=depth)
+    # futures in submission order; bounds the extractions in flight
+    pending = queue.Queue(maxsize=depth)
+    source, source_lock = iter(items), threading.Lock()
+    alive = [fetchers]
+    errors = []
+
+    def fetcher():
+        try:
+            while True:
+                with source_lock:
+                    item = next(source, DONE)
+                if item is DONE:
+                    break
+                payload, seconds = _timed_call(fetch, item)
+                stats["fetch"].add(busy=seconds)
+                _put(fetched, payload, stats["fetch"])
+        except BaseException as e:
+            errors.append(e)
+        finally:
+            with source_lock:
+                alive[0] -= 1
+                last = alive[0] == 0
+            if last:
+                fetched.put(DONE)
+
+    def dispatcher(executor):
+        try:
+            while (payload := fetched.get()) is not DONE:
+                _put(
+                    pending,
+                    executor.submit(_timed_call, extract, payload),
+                    stats["extract"],
+                )
+        except BaseException as e:
+            errors.append(e)
+        finally:
+            pending.put(DONE)
+
+    start = last_report = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=extractors) as executor:
+        threads = [
+            threading.Thread(target=fetcher, daemon=True) for _ in range(fetchers)
+        ]
+        threads.append(
+            threading.Thread(target=dispatcher, args=(executor,), daemon=True)
+        )
+        for t in threads:
+            t.start()
+        while (future := pending.get()) is not DONE:
+            result, seconds = future.result()
+            stats["extract"].add(busy=seconds)
+            t0 = time.perf_counter()
+            write(result)
+            now = time.perf_counter()
+            stats["write"].add(busy=now - t0)
+            if every and now - last_report >= every:
+                last_report = now
+                print(
+                    format_stats(stats, now - start, fetched.qsize(), pending.qsize())
+                )
+        for t in threads:
+            t.join()
+    if errors:
+        raise errors[0]
+    print(format_stats(stats, time.perf_counter() - start, final=True))
+    return stats
+
+
+def format_stats(stats, wall, fetched=None, pending=None, final=False):
+    """One line per stage; the final report names the busiest stage."""
+    lines = [f"[{wall:.1f}s] pipeline" + (" done" if final else "")]
+    queues = {"fetch": fetched, "extract": pending}
+    for name, s in stats.items():
+        depth = queues.get(name)
+        lines.append(
+            "  " + s.line(wall) + (f", queue {depth}" if depth is not None else "")
+        )
+    if final:
+        slowest = max(stats.values(), key=lambda s: s.utilization(wall))
+        lines.append(f"  bound by: {slowest.name}")
+    return "\n".join(lines)
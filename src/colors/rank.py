@@ -0,0 +1,610 @@
+"""All-pairs scoring of Neovim vs iTerm palettes and result I/O."""
+
+import csv
+
+from colors.distance import (
+    RGB_MAX_DISTANCE,
+    pairwise_rgb,
+    similarity_index,
+    symmetric_distance_dense,
+    symmetric_distance_pairwise,
+    symmetric_distance_rgb,
+)
+from colors.metrics import (
+    DEFAULT_METRIC,
+    DEFAULT_PRECISION,
+    column_suffix,
+    coords_dtype,
+    get_metric,
+)
+
+# compare_all scoring kernels: pair by pair, one padded batch per nvim
+# palette (pack_palettes), or the whole matrix in tiles (colors.tiled)
+KERNELS = ("pairs", "dense", "tiled")
+
+RESULT_HEADER = [
+    "nvim_name",
+    "iterm_name",
+    "iterm_url",
+    "similarity_score_rgb",
+    "similarity_score_lab",
+    "similarity_index_rgb",
+    "similarity_index_lab",
+]
+
+
+def result_header(metric=DEFAULT_METRIC):
+    """RESULT_HEADER with the perceptual columns named after the metric."""
+    suffix = column_suffix(metric)
+    return [h.replace("_lab", f"_{suffix}") for h in RESULT_HEADER]
+
+
+def load_color_table(path):
+    """Colors TSV -> (names, urls, rgb, offsets) without per-row parsing.
+
+    The colors column of every row is decoded in one vectorized pass
+    (colors.convert.decode_hex_buffer): rgb is an (N, 3) uint8 array and
+    the colors of row i are rgb[offsets[i]:offsets[i + 1]].
+    """
+    from colors.convert import decode_hex_buffer
+
+    with open(path, "rb") as f:
+        lines = f.read().splitlines()
+    header = lines[0].decode("utf-8").split("\t")
+    i_name, i_url, i_colors = (header.index(c) for c in ("name", "url", "colors"))
+    ncols = len(header)
+
+    names, urls, cols = [], [], []
+    for line in lines[1:]:
+        fields = line.split(b"\t", ncols - 1)
+        if len(fields) <= i_colors or not fields[i_colors]:
+            continue
+        names.append(fields[i_name].decode("utf-8"))
+        urls.append(fields[i_url].decode("utf-8"))
+        cols.append(fields[i_colors])
+
+    starts, pos = [], 0
+    for col in cols:
+        starts.append(pos)
+        pos += len(col) + 1
+    rgb, offsets = decode_hex_buffer(b",".join(cols), starts)
+    return names, urls, rgb, offsets
+
+
+def load_themes(
+    path,
+    to_lab=None,
+    k=None,
+    merge_de=None,
+    method="kmeans",
+    metric=DEFAULT_METRIC,
+    precision=DEFAULT_PRECISION,
+):
+    """Colors TSV (name,url,[status,]colors) -> list of theme dicts.
+
+    to_lab converts the list of (R,G,B) to the perceptual coordinates stored
+    under "labs"; defaults to the color space of metric (skimage Lab for the
+    CIE formulas), held as precision floats. Rows without colors are
+    skipped. With k and/or merge_de each palette is reduced (see
+    colors.reduce) and the theme gets a "weights" entry. With precision
+    float32 each theme also keeps its slice of the decoded uint8 table
+    under "rgb8", for the integer RGB kernels.
+    """
+    names, urls, rgb, offsets = load_color_table(path)
+    rgbs = list(map(tuple, rgb.tolist()))
+    # one conversion call for the whole table, sliced per theme below
+    if not rgbs:
+        labs = []
+    elif to_lab is None:
+        labs = (
+            get_metric(metric)
+            .to_coords(rgb)
+            .astype(coords_dtype(precision), copy=False)
+        )
+    else:
+        labs = to_lab(rgbs)
+
+    themes = []
+    for i, (name, url) in enumerate(zip(names, urls)):
+        a, b = offsets[i], offsets[i + 1]
+        if a == b:
+            continue
+        theme = {"name": name, "url": url, "rgbs": rgbs[a:b], "labs": labs[a:b]}
+        if precision == "float32":
+            theme["rgb8"] = rgb[a:b]
+        if k or merge_de:
+            theme = reduce_theme(theme, k=k, merge_de=merge_de, method=method)
+        themes.append(theme)
+    return themes
+
+
+def reduce_theme(theme, k=None, merge_de=None, method="kmeans"):
+    """Theme cut down to representative colors, with per-color weights."""
+    from colors.convert import lab_array
+    from colors.reduce import reduce_palette
+
+    idx, weights = reduce_palette(
+        lab_array(theme["labs"]), k=k, merge_de=merge_de, method=method
+    )
+    return dict(
+        _take(theme, idx),
+        weights=[float(w) for w in weights],
+    )
+
+
+def _take(theme, idx):
+    labs = theme["labs"]
+    labs = [labs[i] for i in idx] if isinstance(labs, list) else labs[idx]
+    taken = {
+        "name": theme["name"],
+        "url": theme["url"],
+        "rgbs": [theme["rgbs"][i] for i in idx],
+        "labs": labs,
+    }
+    if "rgb8" in theme:
+        taken["rgb8"] = theme["rgb8"][idx]
+    return taken
+
+
+# ---------- Palette dedup ----------
+def canonical_palette(rgbs):
+    """Sorted unique (R,G,B) colors; order and repeats don't change a palette."""
+    return tuple(sorted(set(rgbs)))
+
+
+def palette_key(rgbs, weights=None):
+    """Content hash of the canonical palette (and weights, if reduced)."""
+    import hashlib
+
+    h = hashlib.sha1(bytes(v for rgb in canonical_palette(rgbs) for v in rgb))
+    if weights is not None:
+        totals = {}
+        for rgb, w in zip(rgbs, weights):
+            totals[rgb] = totals.get(rgb, 0.0) + w
+        h.update(repr([totals[rgb] for rgb in sorted(totals)]).encode())
+    return h.hexdigest()
+
+
+def canonical_theme(theme):
+    """Copy of theme whose rgbs/labs (and weights) are in canonical order."""
+    first = {}
+    totals = {}
+    weights = theme.get("weights")
+    for i, rgb in enumerate(theme["rgbs"]):
+        first.setdefault(rgb, i)
+        if weights is not None:
+            totals[rgb] = totals.get(rgb, 0.0) + weights[i]
+    idx = [first[rgb] for rgb in sorted(first)]
+    canonical = _take(theme, idx)
+    if weights is not None:
+        canonical["weights"] = [totals[rgb] for rgb in sorted(first)]
+    return canonical
+
+
+def _hausdorff_lab(lab1, lab2):
+    import numpy as np
+
+    d = np.sqrt(((lab1[:, None, :] - lab2[None, :, :]) ** 2).sum(axis=2))
+    return max(d.min(axis=1).max(), d.min(axis=0).max())
+
+
+def collapse_within(groups, tolerance):
+    """Merge palette groups of equal size whose colors all match within
+    tolerance (CIE76 ΔE, both directions); the first group stays representative.
+    """
+    import numpy as np
+
+    kept = []
+    by_size = {}
+    for rep, members in groups:
+        labs = np.asarray(rep["labs"], dtype=float)
+        for other_labs, other in by_size.get(len(labs), []):
+            if _hausdorff_lab(labs, other_labs) <= tolerance:
+                other[1].extend(members)
+                break
+        else:
+            group = (rep, list(members))
+            kept.append(group)
+            by_size.setdefault(len(labs), []).append((labs, group))
+    return kept
+
+
+def group_palettes(themes, tolerance=None):
+    """[(representative, [themes...])] with one entry per unique palette."""
+    groups = {}
+    for theme in themes:
+        key = palette_key(theme["rgbs"], theme.get("weights"))
+        if key in groups:
+            groups[key][1].append(theme)
+        else:
+            groups[key] = (canonical_theme(theme), [theme])
+    groups = list(groups.values())
+    if tolerance:
+        groups = collapse_within(groups, tolerance)
+    return groups
+
+
+# ---------- Worker ----------
+def _rgb_array(theme, precision):
+    """The theme's uint8 "rgb8" colors in float32 mode, else its rgbs."""
+    return theme["rgb8"] if precision == "float32" else theme["rgbs"]
+
+
+def score_one_nvim(
+    nvim, iterm_themes, metric=DEFAULT_METRIC, precision=DEFAULT_PRECISION
+):
+    """(rgb_score, lab_score) of one nvim palette against each iTerm palette
+
+    With precision float32 the RGB distances run on the uint8 palettes
+    (exact) and the perceptual kernel on the float32 coordinates, both
+    from load_themes.
+    """
+    m = get_metric(metric)
+    scores = []
+    w1 = nvim.get("weights")
+    nvim_rgbs = _rgb_array(nvim, precision)
+    for iterm in iterm_themes:
+        w2 = iterm.get("weights")
+        # RGB distance
+        rgb_score = symmetric_distance_rgb(
+            nvim_rgbs, _rgb_array(iterm, precision), w1, w2
+        )
+        # perceptual distance (ΔE2000 by default)
+        lab_score = symmetric_distance_pairwise(
+            nvim["labs"], iterm["labs"], m.pairwise, w1, w2, m.symmetric
+        )
+        scores.append((float(rgb_score), float(lab_score)))
+    return scores
+
+
+def pack_palettes(themes, precision=DEFAULT_PRECISION):
+    """Themes -> fixed-shape arrays for symmetric_distance_dense.
+
+    Palettes are padded to the longest one: "rgbs" (n, S, 3) float (uint8
+    with precision float32), "labs" (n, S, 3) in the coordinates' dtype
+    and "weights" (n, S), the palette
+    weights (1.0 if unweighted) with 0 in the padding. iTerm palettes are
+    at most a couple dozen colors, so the padding is small.
+    """
+    import numpy as np
+
+    n, S = len(themes), max((len(t["rgbs"]) for t in themes), default=0)
+    dtype = coords_dtype(precision)
+    rgbs = np.zeros((n, S, 3), dtype=np.uint8 if precision == "float32" else float)
+    labs = np.zeros((n, S, 3), dtype=dtype)
+    weights = np.zeros((n, S))
+    for i, t in enumerate(themes):
+        m = len(t["rgbs"])
+        rgbs[i, :m] = _rgb_array(t, precision)
+        labs[i, :m] = t["labs"]
+        weights[i, :m] = t.get("weights") or 1.0
+    return {"rgbs": rgbs, "labs": labs, "weights": weights}
+
+
+def take_packed(packed, idx):
+    """The themes idx of pack_palettes output."""
+    return {k: v[idx] for k, v in packed.items()}
+
+
+def score_one_nvim_dense(nvim, packed, metric=DEFAULT_METRIC):
+    """score_one_nvim against pack_palettes output: one kernel call per space.
+
+    Matches the per-pair loop to ~1e-13 (summation order differs). uint8
+    packed colors (precision float32) take exact int32 differences.
+    """
+    import numpy as np
+
+    m = get_metric(metric)
+    w, weights = nvim.get("weights"), packed["weights"]
+    if packed["rgbs"].dtype == np.uint8:
+        c = np.asarray(nvim["rgb8"], dtype=np.int32)
+    else:
+        c = np.asarray(nvim["rgbs"], dtype=float)
+    rgb_scores = symmetric_distance_dense(c, packed["rgbs"], weights, pairwise_rgb, w)
+    lab_scores = symmetric_distance_dense(
+        np.asarray(nvim["labs"]),
+        packed["labs"],
+        weights,
+        m.pairwise,
+        w,
+        m.symmetric,
+    )
+    return list(zip(rgb_scores.tolist(), lab_scores.tolist()))
+
+
+# iTerm palettes of the running compare_all, sent once per worker process
+_WORKER_ITERM = {}
+
+
+def _init_worker(iterm_reps, packed):
+    _WORKER_ITERM.update(reps=iterm_reps, packed=packed)
+
+
+def score_chunk(pieces, kernel, metric, precision):
+    """Score a schedule chunk in a pool worker.
+
+    pieces are (i, nvim, cols) against the worker's iTerm palettes.
+    Returns ([(i, cols, scores), ...], pid, busy seconds).
+    """
+    import os
+    import time
+
+    start = time.perf_counter()
+    out = []
+    for i, nvim, cols in pieces:
+        if kernel == "dense":
+            packed = take_packed(_WORKER_ITERM["packed"], cols)
+            scores = score_one_nvim_dense(nvim, packed, metric)
+        else:
+            iterms = [_WORKER_ITERM["reps"][j] for j in cols]
+            scores = score_one_nvim(nvim, iterms, metric, precision)
+        out.append((i, cols, scores))
+    return out, os.getpid(), time.perf_counter() - start
+
+
+def result_row(nvim, iterm, rgb_score, lab_score, metric=DEFAULT_METRIC):
+    return (
+        nvim["name"],
+        iterm["name"],
+        iterm["url"],
+        rgb_score,
+        lab_score,
+        similarity_index(rgb_score, RGB_MAX_DISTANCE),
+        similarity_index(lab_score, get_metric(metric).max_distance),
+    )
+
+
+def compare_all(
+    nvim_themes,
+    iterm_themes,
+    workers=None,
+    dedupe=True,
+    tolerance=None,
+    metric=DEFAULT_METRIC,
+    store=None,
+    precision=DEFAULT_PRECISION,
+    kernel="pairs",
+):
+    """Score every nvim x iTerm pair in a process pool, best Lab match first.
+
+    With dedupe, themes sharing a palette (forks, ports, renamed variants)
+    are scored once per unique palette pair and the scores fanned back out
+    to every theme name. tolerance additionally collapses palettes that
+    match within that CIE76 ΔE (approximate).
+
+    store is a path to a pair-score store (colors.store): palette pairs
+    already in it are reused and only new or changed palettes are scored,
+    so adding themes costs O(new x corpus). Scores are stored per metric
+    and precision.
+
+    precision float32 expects themes loaded with the same precision.
+
+    kernel "dense" scores each nvim palette against all iTerm palettes with
+    one batched fixed-shape kernel call (pack_palettes) instead of a loop
+    over pairs; "tiled" computes the whole score matrix with colors.tiled
+    (one GEMM per tile on BLAS threads for Euclidean metrics; ciede2000
+    and cie94 tiles go to the process pool). Both agree with "pairs" to
+    ~1e-13.
+    """
+    import time
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    if kernel not in KERNELS:
+        raise ValueError(f"unknown kernel {kernel!r}; choose from {', '.join(KERNELS)}")
+
+    if dedupe:
+        nvim_groups = group_palettes(nvim_themes, tolerance)
+        iterm_groups = group_palettes(iterm_themes, tolerance)
+        print(
+            f"Unique palettes: {len(nvim_groups)}/{len(nvim_themes)} nvim, "
+            f"{len(iterm_groups)}/{len(iterm_themes)} iTerm"
+        )
+    elif store:
+        raise ValueError("a score store needs palette dedupe")
+    else:
+        nvim_groups = [(t, [t]) for t in nvim_themes]
+        iterm_groups = [(t, [t]) for t in iterm_themes]
+    iterm_reps = [rep for rep, _ in iterm_groups]
+
+    conn = None
+    if store:
+        from colors.store import load_scores, open_store, save_scores
+
+        conn = open_store(store)
+        store_metric = metric if precision == "float64" else f"{metric}:{precision}"
+        iterm_keys = [palette_key(t["rgbs"], t.get("weights")) for t in iterm_reps]
+
+    # palette pairs still to score per nvim group, the rest from the store
+    todos, cached = [], []
+    for rep, _ in nvim_groups:
+        done, todo = {}, list(range(len(iterm_reps)))
+        if conn is not None:
+            nvim_key = palette_key(rep["rgbs"], rep.get("weights"))
+            stored = load_scores(conn, nvim_key, store_metric)
+            done = {j: stored[k] for j, k in enumerate(iterm_keys) if k in stored}
+            todo = [j for j in todo if j not in done]
+        todos.append(todo)
+        cached.append(done)
+    reused = sum(map(len, cached))
+    scored = sum(map(len, todos))
+
+    results = []
+
+    def finish(i, new_scores):
+        (rep, members), todo = nvim_groups[i], todos[i]
+        scores = dict(cached[i])
+        scores.update(zip(todo, new_scores))
+        if conn is not None and todo:
+            save_scores(
+                conn,
+                palette_key(rep["rgbs"], rep.get("weights")),
+                store_metric,
+                [(iterm_keys[j], scores[j]) for j in todo],
+            )
+        for nvim in members:
+            for j, (_, iterm_members) in enumerate(iterm_groups):
+                rgb_score, lab_score = scores[j]
+                for iterm in iterm_members:
+                    results.append(
+                        result_row(nvim, iterm, rgb_score, lab_score, metric)
+                    )
+
+    if kernel == "tiled":
+        from colors.tiled import score_matrix
+
+        # one matrix over the nvim groups and iTerm palettes with work left
+        rows = [i for i, todo in enumerate(todos) if todo]
+        cols = sorted({j for i in rows for j in todos[i]})
+        if rows:
+            rgb, lab = score_matrix(
+                [nvim_groups[i][0] for i in rows],
+                [iterm_reps[j] for j in cols],
+                metric,
+                precision,
+                workers=workers,
+            )
+        row_of = {i: r for r, i in enumerate(rows)}
+        col_of = {j: c for c, j in enumerate(cols)}
+        for i, todo in enumerate(todos):
+            r = row_of.get(i)
+            finish(
+                i, [(float(rgb[r, col_of[j]]), float(lab[r, col_of[j]])) for j in todo]
+            )
+    else:
+        from colors.schedule import (
+            format_utilization,
+            plan_chunks,
+            pool_size,
+        )
+
+        packed = pack_palettes(iterm_reps, precision) if kernel == "dense" else None
+        workers = pool_size(workers)
+        chunks = plan_chunks(
+            [len(rep["rgbs"]) for rep, _ in nvim_groups],
+            todos,
+            [len(rep["rgbs"]) for rep in iterm_reps],
+            workers,
+        )
+        new = [{} for _ in nvim_groups]
+        busy, done = {}, {}
+        start = time.perf_counter()
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(iterm_reps, packed),
+        ) as executor:
+            futures = [
+                executor.submit(
+                    score_chunk,
+                    [(i, nvim_groups[i][0], cols) for i, cols in pieces],
+                    kernel,
+                    metric,
+                    precision,
+                )
+                for _, pieces in chunks
+            ]
+            for future in as_completed(futures):
+                out, pid, seconds = future.result()
+                busy[pid] = busy.get(pid, 0.0) + seconds
+                done[pid] = done.get(pid, 0) + 1
+                for i, cols, scores in out:
+                    new[i].update(zip(cols, scores))
+        if chunks:
+            wall = time.perf_counter() - start
+            print(format_utilization(busy, done, wall, workers))
+        for i, todo in enumerate(todos):
+            finish(i, [new[i][j] for j in todo])
+
+    if conn is not None:
+        conn.close()
+        print(f"Score store: reused {reused} palette pairs, scored {scored}")
+
+    sort_results(results)
+    return results
+
+
+def compare_all_colormath(nvim_themes, iterm_themes, metric=DEFAULT_METRIC):
+    """Pure-Python reference: every pair scored with colormath, one by one.
+
+    Themes must carry colormath LabColors under "labs" (see
+    colors.convert.rgb_to_lab). Slow; kept to check the fast engines.
+    """
+    from colors.distance import (
+        LAB_DISTANCES,
+        LAB_MAX_DISTANCE,
+        srgb_euclid,
+        symmetric_distance,
+    )
+
+    lab_distance = LAB_DISTANCES[metric]
+    results = []
+    for nvim in nvim_themes:
+        for iterm in iterm_themes:
+            w1, w2 = nvim.get("weights"), iterm.get("weights")
+
+            # RGB
+            rgb_score = symmetric_distance(
+                nvim["rgbs"], iterm["rgbs"], srgb_euclid, w1, w2
+            )
+            rgb_norm = similarity_index(rgb_score, RGB_MAX_DISTANCE)
+
+            # Lab
+            lab_score = symmetric_distance(
+                nvim["labs"], iterm["labs"], lab_distance, w1, w2
+            )
+            lab_norm = similarity_index(lab_score, LAB_MAX_DISTANCE)
+
+            results.append(
+                (
+                    nvim["name"],
+                    iterm["name"],
+                    iterm["url"],
+                    rgb_score,
+                    lab_score,
+                    rgb_norm,
+                    lab_norm,
+                )
+            )
+
+    # Sort by best perceptual match
+    sort_results(results)
+    return results
+
+
+def result_sort_key(row):
+    # best perceptual match first; names break ties so output is deterministic
+    return (-row[6], row[0], row[1], row[2])
+
+
+def sort_results(results):
+    # Sort by best perceptual match
+    results.sort(key=result_sort_key)
+
+
+def write_results(path, results, header=RESULT_HEADER):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f, delimiter="\t")
+        writer.writerow(header)
+        writer.writerows(results)
+
+
+def diff_urls(iterm_url, nvim_url):
+    """Fetch one iTerm and one Neovim theme and compare them in sRGB."""
+    from colors.distance import symmetric_distance
+    from colors.extract import load_iterm_colors, load_nvim_colors
+
+    iterm = load_iterm_colors(iterm_url)
+    if not iterm:
+        raise RuntimeError("No colors parsed from iTerm theme.")
+    nvim = load_nvim_colors(nvim_url)
+    if not nvim:
+        raise RuntimeError("No colors parsed from Neovim theme.")
+
+    # symmetric average (so order doesn’t matter)
+    score = symmetric_distance(iterm, nvim)
+
+    return {
+        "iterm_colors_count": len(iterm),
+        "nvim_colors_count": len(nvim),
+        "similarity_score": score,  # lower = more similar
+    }
@@ -0,0 +1,131 @@
+"""Palette reduction: cap large scraped palettes to k weighted colors.
+
+Reducers work on an (N, 3) Lab array and return (indices, weights): the
+indices pick representative colors from the original palette (so RGB and
+Lab stay in step) and the weights count how many input colors each one
+stands for.
+"""
+
+REDUCE_METHODS = ("kmeans", "median-cut")
+
+
+def merge_within(labs, threshold, weights=None):
+    """Greedy perceptual merge: colors within threshold (CIE76 ΔE) of an
+    earlier representative are folded into it."""
+    import numpy as np
+
+    labs = np.asarray(labs, dtype=float)
+    if weights is None:
+        weights = np.ones(len(labs))
+    reps = []
+    rep_weights = []
+    for i, lab in enumerate(labs):
+        if reps:
+            d = np.sqrt(((labs[reps] - lab) ** 2).sum(axis=1))
+            j = int(d.argmin())
+            if d[j] <= threshold:
+                rep_weights[j] += weights[i]
+                continue
+        reps.append(i)
+        rep_weights.append(float(weights[i]))
+    return np.array(reps, dtype=int), np.array(rep_weights)
+
+
+def _medoids(labs, weights, labels, k):
+    """Per cluster: the member closest to the weighted centroid, and its weight."""
+    import numpy as np
+
+    idx, w = [], []
+    for c in range(k):
+        members = np.flatnonzero(labels == c)
+        if len(members) == 0:
+            continue
+        mw = weights[members]
+        centroid = (labs[members] * mw[:, None]).sum(axis=0) / mw.sum()
+        d = ((labs[members] - centroid) ** 2).sum(axis=1)
+        idx.append(members[d.argmin()])
+        w.append(mw.sum())
+    return np.array(idx, dtype=int), np.array(w)
+
+
+def kmeans_lab(labs, k, weights=None, iters=25):
+    """Weighted k-means in Lab with deterministic farthest-point seeding."""
+    import numpy as np
+
+    labs = np.asarray(labs, dtype=float)
+    if weights is None:
+        weights = np.ones(len(labs))
+    if len(labs) <= k:
+        return np.arange(len(labs)), np.asarray(weights, dtype=float)
+
+    centers = [labs[weights.argmax()]]
+    d = ((labs - centers[0]) ** 2).sum(axis=1)
+    for _ in range(1, k):
+        nxt = labs[(d * weights).argmax()]
+        centers.append(nxt)
+        d = np.minimum(d, ((labs - nxt) ** 2).sum(axis=1))
+    centers = np.array(centers)
+
+    labels = None
+    for _ in range(iters):
+        dists = ((labs[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2)
+        new_labels = dists.argmin(axis=1)
+        if labels is not None and (new_labels == labels).all():
+            break
+        labels = new_labels
+        for c in range(k):
+            m = labels == c
+            if m.any():
+                centers[c] = (labs[m] * weights[m, None]).sum(axis=0) / weights[m].sum()
+    return _medoids(labs, weights, labels, k)
+
+
+def median_cut_lab(labs, k, weights=None):
+    """Weighted median cut in Lab: split the widest box at its weighted median."""
+    import numpy as np
+
+    labs = np.asarray(labs, dtype=float)
+    if weights is None:
+        weights = np.ones(len(labs))
+    if len(labs) <= k:
+        return np.arange(len(labs)), np.asarray(weights, dtype=float)
+
+    boxes = [np.arange(len(labs))]
+    while len(boxes) < k:
+        spans = [np.ptp(labs[b], axis=0).max() if len(b) > 1 else -1 for b in boxes]
+        widest = int(np.argmax(spans))
+        if spans[widest] <= 0:
+            break
+        box = boxes.pop(widest)
+        axis = np.ptp(labs[box], axis=0).argmax()
+        box = box[np.argsort(labs[box, axis], kind="stable")]
+        cum = np.cumsum(weights[box])
+        cut = int(np.searchsorted(cum, cum[-1] / 2.0)) + 1
+        cut = min(max(cut, 1), len(box) - 1)
+        boxes.extend([box[:cut], box[cut:]])
+
+    labels = np.empty(len(labs), dtype=int)
+    for c, box in enumerate(boxes):
+        labels[box] = c
+    return _medoids(labs, weights, labels, len(boxes))
+
+
+def reduce_palette(labs, k=None, merge_de=None, method="kmeans"):
+    """Merge within merge_de, then cap to k colors -> (indices, weights)."""
+    import numpy as np
+
+    labs = np.asarray(labs, dtype=float)
+    idx = np.arange(len(labs))
+    weights = np.ones(len(labs))
+    if merge_de:
+        idx, weights = merge_within(labs, merge_de)
+    if k and len(idx) > k:
+        if method == "kmeans":
+            sub, weights = kmeans_lab(labs[idx], k, weights)
+        elif method == "median-cut":
+            sub, weights = median_cut_lab(labs[idx], k, weights)
+        else:
+            raise ValueError(f"unknown reduce method {method!r}")
+        idx = idx[sub]
+    order = np.argsort(idx, kind="stable")
+    return idx[order], weights[order]
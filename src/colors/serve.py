@@ -0,0 +1,338 @@
+"""Resident query service: palettes loaded once, compare/nearest over HTTP.
+
+``python -m colors serve`` loads both colors TSVs (and their Lab data) into
+memory and answers JSON queries on localhost or a Unix socket:
+
+    POST /compare  {"nvim": NAME|PALETTE, "iterm": NAME|PALETTE}
+    POST /nearest  {"nvim": NAME} | {"iterm": NAME} | {"colors": [...], "among": "iterm"}
+                   optional "k" (default 10) and "exact" (skip screening)
+    GET  /health   corpus sizes and load time
+    POST /reload   reload the corpus now
+
+A PALETTE is {"colors": ["#RRGGBB", ...]}. A JSON list of queries is
+answered with a list of results. The TSVs are polled and the corpus is
+swapped in place when they change; queries in flight keep the old one.
+"""
+
+import json
+import os
+import threading
+import time
+
+from colors.metrics import DEFAULT_METRIC, get_metric, pairwise_euclid
+
+
+class Corpus:
+    """Both theme tables, flattened for one-matrix scoring, hot-reloadable."""
+
+    def __init__(self, nvim_path, iterm_path, metric=DEFAULT_METRIC, **reduce):
+        self.paths = {"nvim": nvim_path, "iterm": iterm_path}
+        self.metric = metric
+        self.reduce = reduce
+        self.snapshot = None
+        self._mtimes = None
+        self._lock = threading.Lock()
+        self.reload()
+
+    def _stat(self):
+        return tuple(os.stat(p).st_mtime_ns for p in self.paths.values())
+
+    def reload(self):
+        """Load both tables and swap them in as one snapshot."""
+        import numpy as np
+
+        from colors.rank import load_themes
+
+        with self._lock:
+            mtimes = self._stat()
+            # memo: named nearest queries, valid for this snapshot only
+            snap = {"loaded_at": time.time(), "memo": {}}
+            for side, path in self.paths.items():
+                # palette reduction caps the nvim side only
+                reduce = self.reduce if side == "nvim" else {}
+                themes = load_themes(path, metric=self.metric, **reduce)
+                sizes = [len(t["rgbs"]) for t in themes]
+                weights = [t.get("weights") or [1.0] * n for t, n in zip(themes, sizes)]
+                labs = [np.asarray(t["labs"]) for t in themes]
+                snap[side] = {
+                    "themes": themes,
+                    "by_name": {t["name"]: t for t in themes},
+                    "rgbs": np.array(
+                        [c for t in themes for c in t["rgbs"]], float
+                    ).reshape(-1, 3),
+                    # an empty table still serves (and answers nothing)
+                    "labs": np.concatenate(labs) if labs else np.empty((0, 3)),
+                    "weights": (
+                        np.concatenate(weights)
+                        if any(t.get("weights") for t in themes)
+                        else None
+                    ),
+                    "offsets": np.concatenate([[0], np.cumsum(sizes)]),
+                }
+            self.snapshot = snap
+            self._mtimes = mtimes
+        print(
+            f"Loaded {len(snap['nvim']['themes'])} nvim, "
+            f"{len(snap['iterm']['themes'])} iTerm themes"
+        )
+
+    def reload_if_changed(self):
+        try:
+            changed = self._stat() != self._mtimes
+        except OSError:
+            return False
+        if changed:
+            self.reload()
+        return changed
+
+    def watch(self, interval=2.0):
+        """Poll the TSVs in a daemon thread and reload when they change."""
+
+        def loop():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.reload_if_changed()
+                except Exception as e:
+                    # a half-written file; keep serving the old snapshot
+                    print(f"Reload failed, keeping previous corpus: {e}")
+
+        threading.Thread(target=loop, daemon=True).start()
+
+
+# ---------- Queries ----------
+def _palette(snap, metric, side, spec):
+    """Theme dict for a corpus name or an ad-hoc {"colors": [...]} palette."""
+    if isinstance(spec, str):
+        theme = snap[side]["by_name"].get(spec)
+        if theme is None:
+            raise KeyError(f"unknown {side} theme: {spec}")
+        return theme
+    if not isinstance(spec, dict):
+        raise TypeError(f"{side or 'palette'} must be a theme name or a palette")
+    from colors.convert import parse_hex_list
+
+    rgbs = parse_hex_list(",".join(spec.get("colors", [])))
+    if not rgbs:
+        raise ValueError("palette has no valid #RRGGBB colors")
+    return {"name": None, "rgbs": rgbs, "labs": get_metric(metric).to_coords(rgbs)}
+
+
+def _scores(metric, rgb_score, lab_score):
+    from colors.distance import RGB_MAX_DISTANCE, similarity_index
+
+    return {
+        "rgb_score": float(rgb_score),
+        "lab_score": float(lab_score),
+        "similarity_index_rgb": similarity_index(rgb_score, RGB_MAX_DISTANCE),
+        "similarity_index_lab": similarity_index(
+            lab_score, get_metric(metric).max_distance
+        ),
+    }
+
+
+def compare(corpus, q):
+    """Scores of one nvim/iTerm pair, as a compare row."""
+    from colors.rank import score_one_nvim
+
+    snap, metric = corpus.snapshot, corpus.metric
+    nvim = _palette(snap, metric, "nvim", q["nvim"])
+    iterm = _palette(snap, metric, "iterm", q["iterm"])
+    ((rgb_score, lab_score),) = score_one_nvim(nvim, [iterm], metric)
+    return _scores(metric, rgb_score, lab_score)
+
+
+def nearest(corpus, q, screen=10):
+    """Top-k themes of the other corpus for a theme or palette.
+
+    Every theme is screened with the Lab Euclidean distance (one GEMM over
+    the flattened corpus); the best max(100, screen * k) are re-ranked with
+    the exact metric. Euclidean metrics, and "exact": true, skip screening.
+    Answers for named themes are memoized until the corpus reloads.
+    """
+    snap = corpus.snapshot
+    if not isinstance(q.get("nvim", q.get("iterm")), str):
+        return _nearest(snap, corpus.metric, q, screen)
+    key = (q.get("nvim"), q.get("iterm"), int(q.get("k", 10)), bool(q.get("exact")))
+    if key not in snap["memo"]:
+        snap["memo"][key] = _nearest(snap, corpus.metric, q, screen)
+    return snap["memo"][key]
+
+
+def _nearest(snap, metric, q, screen):
+    import numpy as np
+
+    from colors.distance import pairwise_rgb, symmetric_distance_segments
+
+    m = get_metric(metric)
+    if "colors" in q:
+        among = q.get("among", "iterm")
+        if among not in ("nvim", "iterm"):
+            raise ValueError('"among" must be "nvim" or "iterm"')
+        theme = _palette(snap, metric, None, q)
+    else:
+        side = "nvim" if "nvim" in q else "iterm"
+        among = "iterm" if side == "nvim" else "nvim"
+        theme = _palette(snap, metric, side, q[side])
+    k = int(q.get("k", 10))
+    pool = snap[among]
+    if not pool["themes"]:
+        return []
+    labs, offsets = pool["labs"], pool["offsets"]
+    w, flat_w = theme.get("weights"), pool["weights"]
+
+    cand = np.arange(len(pool["themes"]))
+    n_cand = max(100, screen * k)
+    exact = q.get("exact") or m.pairwise is pairwise_euclid
+    if not exact and len(cand) > n_cand:
+        screened = symmetric_distance_segments(
+            theme["labs"], labs, offsets, pairwise_euclid, w, flat_w
+        )
+        cand = np.sort(np.argpartition(screened, n_cand)[:n_cand])
+
+    # flattened rows of the candidate themes only
+    idx = np.concatenate([np.arange(offsets[i], offsets[i + 1]) for i in cand])
+    sub_off = np.concatenate([[0], np.cumsum(np.diff(offsets)[cand])])
+    sub_w = None if flat_w is None else flat_w[idx]
+    lab_scores = symmetric_distance_segments(
+        theme["labs"], labs[idx], sub_off, m.pairwise, w, sub_w, m.symmetric
+    )
+    rgb_scores = symmetric_distance_segments(
+        theme["rgbs"], pool["rgbs"][idx], sub_off, pairwise_rgb, w, sub_w
+    )
+
+    order = sorted(
+        range(len(cand)),
+        key=lambda j: (lab_scores[j], pool["themes"][cand[j]]["name"]),
+    )[:k]
+    return [
+        dict(
+            name=pool["themes"][cand[j]]["name"],
+            url=pool["themes"][cand[j]]["url"],
+            **_scores(metric, rgb_scores[j], lab_scores[j]),
+        )
+        for j in order
+    ]
+
+
+def health(corpus, q=None):
+    snap = corpus.snapshot
+    return {
+        "nvim": len(snap["nvim"]["themes"]),
+        "iterm": len(snap["iterm"]["themes"]),
+        "metric": corpus.metric,
+        "loaded_at": snap["loaded_at"],
+    }
+
+
+def reload(corpus, q=None):
+    corpus.reload()
+    return health(corpus)
+
+
+ROUTES = {
+    ("POST", "/compare"): compare,
+    ("POST", "/nearest"): nearest,
+    ("GET", "/health"): health,
+    ("POST", "/reload"): reload,
+}
+
+
+def answer(corpus, fn, body):
+    """Run fn on one query or a batch; per-query errors come back inline."""
+
+    def one(q):
+        if not isinstance(q, dict):
+            return {"error": "query must be a JSON object"}
+        try:
+            return fn(corpus, q)
+        except (KeyError, ValueError, TypeError) as e:
+            return {"error": str(e).strip("'\"")}
+
+    return [one(q) for q in body] if isinstance(body, list) else one(body)
+
+
+# ---------- Transport ----------
+def make_handler(corpus):
+    from http.server import BaseHTTPRequestHandler
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # keep-alive replies are small; don't let Nagle hold them back
+        disable_nagle_algorithm = True
+
+        def _send(self, status, payload):
+            data = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _route(self, method):
+            fn = ROUTES.get((method, self.path.split("?")[0]))
+            if fn is None:
+                return self._send(404, {"error": f"no route {method} {self.path}"})
+            length = int(self.headers.get("Content-Length") or 0)
+            try:
+                body = json.loads(self.rfile.read(length) or b"{}")
+            except ValueError:
+                return self._send(400, {"error": "body is not valid JSON"})
+            try:
+                result = answer(corpus, fn, body)
+            except Exception as e:
+                return self._send(500, {"error": f"{type(e).__name__}: {e}"})
+            self._send(200, result)
+
+        def do_GET(self):
+            self._route("GET")
+
+        def do_POST(self):
+            self._route("POST")
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def serve(corpus, host="127.0.0.1", port=8770, socket_path=None, poll=2.0):
+    """Serve corpus until interrupted, on a Unix socket if socket_path is set."""
+    import socketserver
+    from http.server import ThreadingHTTPServer
+
+    handler = make_handler(corpus)
+    if socket_path:
+
+        class UnixHTTPServer(
+            socketserver.ThreadingMixIn, socketserver.UnixStreamServer
+        ):
+            daemon_threads = True
+
+            def get_request(self):
+                # BaseHTTPRequestHandler expects a (host, port) client address
+                conn, _ = super().get_request()
+                return conn, ("local", 0)
+
+        class UnixHandler(handler):
+            disable_nagle_algorithm = False  # TCP-only socket option
+
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        server = UnixHTTPServer(socket_path, UnixHandler)
+        where = socket_path
+    else:
+        server = ThreadingHTTPServer((host, port), handler)
+        where = f"http://{host}:{port}"
+
+    if poll:
+        corpus.watch(poll)
+    print(f"Serving {corpus.metric} queries on {where}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if socket_path and os.path.exists(socket_path):
+            os.unlink(socket_path)
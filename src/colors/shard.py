@@ -0,0 +1,112 @@
+"""Split the colors TSVs into shards and merge per-shard results."""
+
+import csv
+import os
+import zlib
+
+
+def shard_of(key, n_shards):
+    """Stable shard index for a theme key (same on every machine and run)."""
+    return zlib.crc32(key.encode("utf-8")) % n_shards
+
+
+def parse_shard(spec):
+    """'i/N' -> (i, N) with 0 <= i < N; an argparse type for --shard"""
+    from argparse import ArgumentTypeError
+
+    try:
+        i, n = (int(x) for x in spec.split("/"))
+    except ValueError:
+        raise ArgumentTypeError(f"shard must look like i/N, got {spec!r}") from None
+    if n < 1 or not 0 <= i < n:
+        raise ArgumentTypeError(f"shard index out of range: {spec!r}")
+    return i, n
+
+
+def select_shard(themes, index, n_shards):
+    """Themes whose url falls in shard index of n_shards."""
+    return [t for t in themes if shard_of(t["url"], n_shards) == index]
+
+
+def write_if_changed(path, text):
+    """Write text to path only if it differs, so unchanged shards keep their mtime."""
+    try:
+        with open(path, encoding="utf-8", newline="") as f:
+            if f.read() == text:
+                return False
+    except FileNotFoundError:
+        pass
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8", newline="") as f:
+        f.write(text)
+    os.replace(tmp, path)
+    return True
+
+
+def pack_shards(tsv_path, out_paths):
+    """Split a colors TSV into len(out_paths) shards keyed by theme url.
+
+    Rows keep their input order inside each shard and every shard repeats
+    the header. Returns the number of shards that were rewritten.
+    """
+    import io
+
+    n_shards = len(out_paths)
+    with open(tsv_path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f, delimiter="\t")
+        header = next(reader)
+        url_col = header.index("url")
+        buffers = [io.StringIO() for _ in range(n_shards)]
+        writers = [csv.writer(b, delimiter="\t") for b in buffers]
+        for w in writers:
+            w.writerow(header)
+        for row in reader:
+            if row:
+                writers[shard_of(row[url_col], n_shards)].writerow(row)
+
+    changed = 0
+    for path, buf in zip(out_paths, buffers):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        changed += write_if_changed(path, buf.getvalue())
+    return changed
+
+
+def _read_results(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f, delimiter="\t")
+        header = next(reader)
+        rows = [row for row in reader if row]
+    return header, rows
+
+
+def merge_results(result_paths, out_path, top_k=None):
+    """Merge per-shard comparison results into one ranked TSV.
+
+    Every partial is already sorted by rank.result_sort_key, so a k-way
+    merge reproduces the single-machine ordering exactly; values are copied
+    through as text, so the output is byte-identical too.
+    """
+    import heapq
+    import itertools
+
+    from colors.rank import result_sort_key
+
+    header = None
+    partials = []
+    for path in result_paths:
+        header, rows = _read_results(path)
+        partials.append(rows)
+
+    def key(row):
+        return result_sort_key(row[:3] + [float(x) for x in row[3:]])
+
+    merged = heapq.merge(*partials, key=key)
+    if top_k is not None:
+        merged = itertools.islice(merged, top_k)
+    merged = list(merged)
+
+    with open(out_path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f, delimiter="\t")
+        writer.writerow(header)
+        writer.writerows(merged)
+    return merged
@@ -0,0 +1,45 @@
+"""Persistent pair-score store keyed by palette hash (SQLite).
+
+Scores depend only on the two palettes and the metric, so a refresh that
+adds a few themes only has to score the new palettes against the corpus.
+"""
+
+import sqlite3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scores (
+    nvim_key TEXT NOT NULL,
+    iterm_key TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    rgb_score REAL NOT NULL,
+    lab_score REAL NOT NULL,
+    PRIMARY KEY (nvim_key, iterm_key, metric)
+)
+"""
+
+
+def open_store(path):
+    # shards may share one store; wait on the write lock instead of failing
+    conn = sqlite3.connect(path, timeout=60)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(SCHEMA)
+    return conn
+
+
+def load_scores(conn, nvim_key, metric):
+    """iterm_key -> (rgb_score, lab_score) already stored for one nvim palette"""
+    rows = conn.execute(
+        "SELECT iterm_key, rgb_score, lab_score FROM scores "
+        "WHERE nvim_key = ? AND metric = ?",
+        (nvim_key, metric),
+    )
+    return {iterm_key: (rgb, lab) for iterm_key, rgb, lab in rows}
+
+
+def save_scores(conn, nvim_key, metric, scored):
+    """scored: iterable of (iterm_key, (rgb_score, lab_score))"""
+    with conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO scores VALUES (?, ?, ?, ?, ?)",
+            [(nvim_key, k, metric, float(r), float(l)) for k, (r, l) in scored],
+        )
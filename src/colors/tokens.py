@@ -0,0 +1,82 @@
+"""Pool of GitHub tokens with per-token rate-limit accounting."""
+
+import threading
+import time
+
+# GitHub's authenticated hourly quota; assumed until a response says otherwise
+DEFAULT_LIMIT = 5000
+
+
+class TokenPool:
+    """Route each request to the token with the most rate-limit headroom.
+
+    Headroom is tracked per (token, resource) from the X-RateLimit-Remaining
+    and X-RateLimit-Reset headers, since core, search and graphql have
+    separate quotas. When every token is exhausted, acquire() sleeps until
+    the earliest reset instead of handing out a token bound to fail.
+    A None token stands for unauthenticated access.
+    """
+
+    def __init__(self, tokens, sleep=time.sleep, clock=time.time):
+        self.tokens = list(dict.fromkeys(tokens)) or [None]
+        self._remaining = {}
+        self._reset = {}
+        self._lock = threading.Lock()
+        self._sleep = sleep
+        self._clock = clock
+
+    def __len__(self):
+        return len(self.tokens)
+
+    def _headroom(self, token, resource, now):
+        key = (token, resource)
+        if self._reset.get(key, 0) <= now:
+            # window rolled over (or never seen): assume a full quota
+            self._remaining.pop(key, None)
+        return self._remaining.get(key, DEFAULT_LIMIT)
+
+    def acquire(self, resource="core"):
+        """Token with the most headroom, parking until a reset if none has any."""
+        while True:
+            with self._lock:
+                now = self._clock()
+                best = max(self.tokens, key=lambda t: self._headroom(t, resource, now))
+                left = self._headroom(best, resource, now)
+                if left > 0:
+                    # reserve one call so concurrent workers spread out
+                    self._remaining[(best, resource)] = left - 1
+                    return best
+                wait = min(self._reset[(t, resource)] for t in self.tokens) - now
+            wait = max(wait, 1.0)
+            print(
+                f"⏸  all {len(self.tokens)} token(s) out of {resource} quota; "
+                f"parking {wait:.0f}s"
+            )
+            self._sleep(wait)
+
+    def update(self, token, headers, resource="core"):
+        """Record the quota reported by a response made with token."""
+        now = self._clock()
+        remaining = headers.get("X-RateLimit-Remaining")
+        reset = headers.get("X-RateLimit-Reset")
+        retry_after = headers.get("Retry-After")
+        key = (token, headers.get("X-RateLimit-Resource", resource))
+        with self._lock:
+            if retry_after is not None:
+                # secondary limit: bench this token for the requested interval
+                self._remaining[key] = 0
+                self._reset[key] = now + float(retry_after)
+                return
+            if remaining is None or reset is None:
+                return
+            self._remaining[key] = int(remaining)
+            # at least a second ahead so a skewed clock cannot spin acquire()
+            self._reset[key] = max(float(reset), now + 1)
+
+
+def is_rate_limited(response):
+    """True for a 403/429 caused by a primary or secondary rate limit."""
+    if response.status_code not in (403, 429):
+        return False
+    h = response.headers
+    return h.get("X-RateLimit-Remaining") == "0" or "Retry-After" in h
@@ -0,0 +1,285 @@
+"""Reference-vs-candidate accuracy harness for the comparison engines.
+
+Runs two engines (or reads two result TSVs) over the same fixed corpus and
+reports how far the candidate's scores and rankings drift from the
+reference: absolute score error, Kendall tau and top-K overlap of each nvim
+theme's iTerm ranking, and the speedup.
+"""
+
+import os
+import tempfile
+import time
+import zlib
+
+from colors.metrics import DEFAULT_METRIC
+
+# failing thresholds used by `python -m colors validate` unless overridden;
+# colormath and skimage Lab already differ by ~0.002 ΔE
+DEFAULT_TOLERANCES = {
+    "max_error": 1e-2,
+    "mean_error": 1e-3,
+    "min_tau": 0.99,
+    "min_overlap": 0.9,
+}
+
+
+# ---------- Engines ----------
+def engine_colormath(nvim_path, iterm_path, metric=DEFAULT_METRIC, workers=1):
+    """cmp_all.py: colormath Lab and ΔE, pair by pair in pure Python."""
+    from colors.convert import rgb_list_to_colormath_lab
+    from colors.distance import LAB_DISTANCES
+    from colors.rank import compare_all_colormath, load_themes
+
+    if metric not in LAB_DISTANCES:
+        raise ValueError(f"colormath has no {metric}; use {', '.join(LAB_DISTANCES)}")
+    nvim = load_themes(nvim_path, to_lab=rgb_list_to_colormath_lab)
+    iterm = load_themes(iterm_path, to_lab=rgb_list_to_colormath_lab)
+    return compare_all_colormath(nvim, iterm, metric)
+
+
+def engine_numpy(nvim_path, iterm_path, metric=DEFAULT_METRIC, workers=1):
+    """cmp2.py without palette dedupe: vectorized kernels, every pair scored."""
+    from colors.rank import compare_all, load_themes
+
+    nvim = load_themes(nvim_path, metric=metric)
+    iterm = load_themes(iterm_path, metric=metric)
+    return compare_all(nvim, iterm, workers=workers, dedupe=False, metric=metric)
+
+
+def engine_numpy_dedupe(nvim_path, iterm_path, metric=DEFAULT_METRIC, workers=1):
+    """cmp2.py defaults: vectorized kernels, one score per unique palette pair."""
+    from colors.rank import compare_all, load_themes
+
+    nvim = load_themes(nvim_path, metric=metric)
+    iterm = load_themes(iterm_path, metric=metric)
+    return compare_all(nvim, iterm, workers=workers, dedupe=True, metric=metric)
+
+
+def engine_numpy_float32(nvim_path, iterm_path, metric=DEFAULT_METRIC, workers=1):
+    """engine_numpy in the float32 / uint8 precision mode."""
+    from colors.rank import compare_all, load_themes
+
+    nvim = load_themes(nvim_path, metric=metric, precision="float32")
+    iterm = load_themes(iterm_path, metric=metric, precision="float32")
+    return compare_all(
+        nvim, iterm, workers=workers, dedupe=False, metric=metric, precision="float32"
+    )
+
+
+def _engine_kernel(kernel):
+    def engine(nvim_path, iterm_path, metric=DEFAULT_METRIC, workers=1):
+        from colors.rank import compare_all, load_themes
+
+        nvim = load_themes(nvim_path, metric=metric)
+        iterm = load_themes(iterm_path, metric=metric)
+        return compare_all(
+            nvim, iterm, workers=workers, dedupe=False, metric=metric, kernel=kernel
+        )
+
+    engine.__doc__ = f"engine_numpy with compare --kernel {kernel}."
+    return engine
+
+
+ENGINES = {
+    "colormath": engine_colormath,
+    "numpy": engine_numpy,
+    "numpy-dedupe": engine_numpy_dedupe,
+    "numpy-float32": engine_numpy_float32,
+    "numpy-dense": _engine_kernel("dense"),
+    "numpy-tiled": _engine_kernel("tiled"),
+}
+
+
+def engine_metrics(name):
+    """Metrics engine name can score, or None for every registered metric."""
+    if name == "colormath":
+        from colors.distance import LAB_DISTANCES
+
+        return tuple(LAB_DISTANCES)
+    return None
+
+
+def check_engine_metric(name, metric):
+    """ValueError unless engine name supports metric."""
+    supported = engine_metrics(name)
+    if supported is not None and metric not in supported:
+        raise ValueError(
+            f"engine {name} has no {metric} metric; use --metric "
+            f"{' / '.join(supported)} or another --reference/--candidate"
+        )
+
+
+def run_engine(name, nvim_path, iterm_path, metric=DEFAULT_METRIC, workers=1):
+    """(result rows, wall seconds) of one engine, loading included."""
+    start = time.perf_counter()
+    rows = ENGINES[name](nvim_path, iterm_path, metric=metric, workers=workers)
+    return rows, time.perf_counter() - start
+
+
+# ---------- Corpus ----------
+def sample_corpus(path, n, out_path):
+    """Write the n rows of a colors TSV with the smallest crc32(url).
+
+    The choice depends only on each row's url, so the sample stays fixed
+    as long as the corpus does and mostly survives it growing.
+    """
+    with open(path, encoding="utf-8") as f:
+        header, *rows = f.read().splitlines()
+    i_url = header.split("\t").index("url")
+    rows = [r for r in rows if r]
+    if n:
+        rows = sorted(rows, key=lambda r: zlib.crc32(r.split("\t")[i_url].encode()))[:n]
+    with open(out_path, "w", encoding="utf-8") as f:
+        f.write("\n".join([header] + rows) + "\n")
+    return out_path
+
+
+# ---------- Comparison ----------
+def kendall_tau(x, y):
+    """Kendall tau-b of two score vectors (ties allowed), O(n^2)."""
+    import numpy as np
+
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    if len(x) < 2:
+        return 1.0
+    iu = np.triu_indices(len(x), 1)
+    dx = np.sign(x[:, None] - x[None, :])[iu]
+    dy = np.sign(y[:, None] - y[None, :])[iu]
+    denom = np.sqrt(np.count_nonzero(dx) * np.count_nonzero(dy))
+    return float((dx * dy).sum() / denom) if denom else 1.0
+
+
+def _scores(rows):
+    """(nvim, iterm, url) -> (rgb_score, lab_score) from rows or TSV rows."""
+    return {(r[0], r[1], r[2]): (float(r[3]), float(r[4])) for r in rows}
+
+
+def _top(keys, scores, k):
+    return {key for key in sorted(keys, key=lambda x: (scores[x][1], x))[:k]}
+
+
+def compare_results(ref_rows, cand_rows, top_k=10):
+    """Accuracy report of cand_rows against ref_rows (compare_all rows)."""
+    import numpy as np
+
+    ref, cand = _scores(ref_rows), _scores(cand_rows)
+    common = sorted(ref.keys() & cand.keys())
+    report = {
+        "pairs": len(common),
+        "missing": len(ref.keys() - cand.keys()),
+        "extra": len(cand.keys() - ref.keys()),
+    }
+    if not common:
+        return report
+
+    for col, name in ((1, "lab"), (0, "rgb")):
+        err = np.abs(
+            np.array([ref[k][col] for k in common])
+            - np.array([cand[k][col] for k in common])
+        )
+        report[f"max_error_{name}"] = float(err.max())
+        report[f"mean_error_{name}"] = float(err.mean())
+
+    # each nvim theme's ranking of the iTerm themes, as the results are used
+    by_nvim = {}
+    for key in common:
+        by_nvim.setdefault(key[0], []).append(key)
+    taus, overlaps = [], []
+    for keys in by_nvim.values():
+        taus.append(kendall_tau([ref[k][1] for k in keys], [cand[k][1] for k in keys]))
+        k = min(top_k, len(keys))
+        overlaps.append(len(_top(keys, ref, k) & _top(keys, cand, k)) / k)
+    report["mean_tau"] = float(np.mean(taus))
+    report["min_tau"] = float(np.min(taus))
+    report["mean_overlap"] = float(np.mean(overlaps))
+    report["min_overlap"] = float(np.min(overlaps))
+    k = min(top_k, len(common))
+    report["global_overlap"] = len(_top(common, ref, k) & _top(common, cand, k)) / k
+    return report
+
+
+def check_tolerances(
+    report, max_error=None, mean_error=None, min_tau=None, min_overlap=None
+):
+    """Human-readable failures of report against the given limits."""
+    failures = []
+    if report["missing"] or report["extra"]:
+        failures.append(
+            f"pair sets differ: {report['missing']} missing, {report['extra']} extra"
+        )
+    if not report["pairs"]:
+        return failures + ["no pairs in common"]
+    if max_error is not None and report["max_error_lab"] > max_error:
+        failures.append(f"max lab error {report['max_error_lab']:.3g} > {max_error:g}")
+    if mean_error is not None and report["mean_error_lab"] > mean_error:
+        failures.append(
+            f"mean lab error {report['mean_error_lab']:.3g} > {mean_error:g}"
+        )
+    if min_tau is not None and report["min_tau"] < min_tau:
+        failures.append(f"min Kendall tau {report['min_tau']:.4f} < {min_tau:g}")
+    if min_overlap is not None and report["min_overlap"] < min_overlap:
+        failures.append(
+            f"min top-K overlap {report['min_overlap']:.3f} < {min_overlap:g}"
+        )
+    return failures
+
+
+def format_report(report, top_k=10):
+    lines = [
+        f"pairs compared: {report['pairs']} "
+        f"({report['missing']} missing, {report['extra']} extra)"
+    ]
+    if "ref_seconds" in report:
+        lines.append(
+            f"reference {report['reference']}: {report['ref_seconds']:.2f}s, "
+            f"candidate {report['candidate']}: {report['cand_seconds']:.2f}s, "
+            f"speedup {report['speedup']:.1f}x"
+        )
+    if report["pairs"]:
+        for name in ("lab", "rgb"):
+            lines.append(
+                f"{name} score |err|: max {report[f'max_error_{name}']:.3g}, "
+                f"mean {report[f'mean_error_{name}']:.3g}"
+            )
+        lines.append(
+            f"Kendall tau per nvim theme: mean {report['mean_tau']:.4f}, "
+            f"min {report['min_tau']:.4f}"
+        )
+        lines.append(
+            f"top-{top_k} overlap per nvim theme: mean {report['mean_overlap']:.3f}, "
+            f"min {report['min_overlap']:.3f}; overall {report['global_overlap']:.3f}"
+        )
+    return "\n".join(lines)
+
+
+def validate(
+    nvim_path,
+    iterm_path,
+    reference="colormath",
+    candidate="numpy",
+    metric=DEFAULT_METRIC,
+    sample_nvim=None,
+    sample_iterm=None,
+    top_k=10,
+    workers=1,
+):
+    """Run both engines on the (sampled) corpus and compare their results."""
+    for name in (reference, candidate):
+        check_engine_metric(name, metric)
+    with tempfile.TemporaryDirectory() as tmp:
+        nvim_path = sample_corpus(nvim_path, sample_nvim, os.path.join(tmp, "n.tsv"))
+        iterm_path = sample_corpus(iterm_path, sample_iterm, os.path.join(tmp, "i.tsv"))
+        ref_rows, ref_s = run_engine(reference, nvim_path, iterm_path, metric, workers)
+        cand_rows, cand_s = run_engine(
+            candidate, nvim_path, iterm_path, metric, workers
+        )
+    report = compare_results(ref_rows, cand_rows, top_k)
+    report.update(
+        reference=reference,
+        candidate=candidate,
+        metric=metric,
+        ref_seconds=ref_s,
+        cand_seconds=cand_s,
+        speedup=ref_s / cand_s if cand_s else float("inf"),
+    )
+    return report
@@ -1,196 +1,154 @@
 import argparse
 import csv
-import math
-import plistlib
-import re
+import os
 import sys
 import time
-from io import BytesIO
-from urllib.parse import urlparse
-
-import requests
-
-HEX_RE = re.compile(r"#(?:[0-9A-Fa-f]{6})")
-
-
-def srgb_euclid(c1, c2):
-    return math.sqrt(sum((a - b) ** 2 for a, b in zip(c1, c2)))
-
-
-def hex_to_rgb(hexstr):
-    hexstr = hexstr.strip()
-    if not hexstr.startswith("#") or len(hexstr) != 7:
-        return None
-    return (int(hexstr[1:3], 16), int(hexstr[3:5], 16), int(hexstr[5:7], 16))
-
-
-def load_iterm_colors(iterm_url):
-    r = requests.get(iterm_url, timeout=30)
-    r.raise_for_status()
-    plist = plistlib.load(BytesIO(r.content))
-    colors = []
-    for v in plist.values():
-        if isinstance(v, dict):
-            r = v.get("Red Component")
-            g = v.get("Green Component")
-            b = v.get("Blue Component")
-            if (
-                isinstance(r, (int, float))
-                and isinstance(g, (int, float))
-                and isinstance(b, (int, float))
-            ):
-                colors.append(
-                    (int(round(r * 255)), int(round(g * 255)), int(round(b * 255)))
-                )
-    return list(dict.fromkeys(colors))
-
-
-def get_github_default_branch(owner, repo):
-    api = f"https://api.github.com/repos/{owner}/{repo}"
-    r = requests.get(api, timeout=30)
-    r.raise_for_status()
-    return r.json().get("default_branch", "main")
-
-
-def github_tree(owner, repo, branch):
-    api = f"https://api.github.com/repos/{owner}/{repo}/git/trees/{branch}?recursive=1"
-    r = requests.get(api, timeout=30)
-    r.raise_for_status()
-    return r.json().get("tree", [])
-
-
-def fetch_text(url):
-    r = requests.get(url, timeout=30)
-    if r.status_code == 404 and "/blob/" in url:
-        url = url.replace(
-            "https://github.com/", "https://raw.githubusercontent.com/"
-        ).replace("/blob/", "/")
-        r = requests.get(url, timeout=30)
-    r.raise_for_status()
-    return r.text
-
-
-def is_github_repo(url):
-    u = urlparse(url)
-    if u.netloc != "github.com":
-        return False
-    parts = [p for p in u.path.split("/") if p]
-    return len(parts) == 2
-
-
-def is_github_file(url):
-    u = urlparse(url)
-    if u.netloc == "raw.githubusercontent.com":
-        return True
-    if u.netloc == "github.com" and "/blob/" in u.path:
-        return True
-    return False
-
-
-def load_nvim_colors(nvim_url):
-    texts = []
-    if is_github_repo(nvim_url):
-        owner, repo = [p for p in urlparse(nvim_url).path.split("/") if p]
-        branch = get_github_default_branch(owner, repo)
-        tree = github_tree(owner, repo, branch)
-        candidate_paths = [
-            obj["path"]
-            for obj in tree
-            if obj.get("path", "").lower().endswith((".lua", ".vim"))
-            and any(
-                seg in obj["path"].lower()
-                for seg in (
-                    "lua/",
-                    "colors/",
-                    "themes/",
-                    "theme/",
-                    "highlight",
-                    "palette",
-                )
-            )
-        ]
-        if not candidate_paths:
-            candidate_paths = [
-                obj["path"]
-                for obj in tree
-                if obj.get("path", "").lower().endswith(".lua")
-            ]
-        for p in candidate_paths:
-            raw = f"https://raw.githubusercontent.com/{owner}/{repo}/{branch}/{p}"
-            try:
-                texts.append(fetch_text(raw))
-            except Exception:
-                pass
-        if not texts:
-            raise RuntimeError("Could not fetch any theme files from repo.")
-    elif is_github_file(nvim_url):
-        texts.append(fetch_text(nvim_url))
-    else:
-        texts.append(fetch_text(nvim_url))
-
-    hexes = set()
-    for t in texts:
-        hexes.update(HEX_RE.findall(t))
-        for m in re.findall(r"0x([0-9A-Fa-f]{6})", t):
-            hexes.add("#" + m)
-
-    colors = []
-    for h in hexes:
-        rgb = hex_to_rgb(h)
-        if rgb:
-            colors.append(rgb)
-    return list(dict.fromkeys(colors))
-
-
-def avg_nearest_neighbor_distance(p1, p2):
-    total = 0.0
-    for c in p1:
-        total += min(srgb_euclid(c, d) for d in p2)
-    return total / max(1, len(p1))
-
-
-def compare_palettes(iterm_url, nvim_colors):
-    iterm = load_iterm_colors(iterm_url)
-    d1 = avg_nearest_neighbor_distance(iterm, nvim_colors)
-    d2 = avg_nearest_neighbor_distance(nvim_colors, iterm)
-    return (d1 + d2) / 2.0
+
+from colors.distance import symmetric_distance_rgb_many
+from colors.extract import load_iterm_colors, load_nvim_colors
+from colors.fetch import is_github_repo_url, repo_owner_name
+
+
+def parse_targets(specs):
+    """--nvim values -> [(tag, url, explicit)].
+
+    Each value is a URL, tag=URL, or a file with one of those per line.
+    Without a tag the repo (or file) name is used, or owner__repo when
+    two targets share a repo name (catppuccin/nvim vs another */nvim).
+    Repeated explicit tags are an error.
+    """
+    targets = _parse_specs(specs)
+    tags = [tag for tag, _, _ in targets]
+    explicit = [tag for tag, _, ex in targets if ex]
+    repeated = sorted({t for t in explicit if explicit.count(t) > 1})
+    if repeated:
+        raise ValueError(f"duplicate target tags: {', '.join(repeated)}")
+
+    out, seen = [], set(explicit)
+    for tag, url, ex in targets:
+        if not ex:
+            if tags.count(tag) > 1 and is_github_repo_url(url):
+                tag = "__".join(repo_owner_name(url))
+            base, n = tag, 1
+            while tag in seen:
+                n += 1
+                tag = f"{base}__{n}"
+            seen.add(tag)
+        out.append((tag, url, ex))
+    return out
+
+
+def _parse_specs(specs):
+    targets = []
+    for spec in specs:
+        if os.path.isfile(spec):
+            with open(spec, encoding="utf-8") as f:
+                lines = [l.strip() for l in f if l.strip() and not l.startswith("#")]
+            targets.extend(_parse_specs(lines))
+            continue
+        tag, sep, url = spec.partition("=")
+        if not sep or "://" in tag:
+            url = spec
+            if is_github_repo_url(url):
+                tag = repo_owner_name(url)[1]
+            else:
+                tag = url.rstrip("/").rsplit("/", 1)[-1]
+        targets.append((tag, url, bool(sep) and "://" not in tag))
+    return targets
+
+
+def load_targets(targets):
+    """(tag, colors) for every target; exits naming the targets whose
+    palette could not be loaded, since their outputs would be missing."""
+    loaded, failed = [], []
+    for tag, url, _ in targets:
+        try:
+            colors = load_nvim_colors(url)
+        except Exception as e:
+            failed.append(f"{tag} ({url}): {e}")
+            continue
+        if not colors:
+            failed.append(f"{tag} ({url}): no colors")
+            continue
+        loaded.append((tag, colors))
+    if failed:
+        sys.exit("Could not load Neovim target palettes:\n  " + "\n  ".join(failed))
+    return loaded
 
 
 def main():
     ap = argparse.ArgumentParser(
-        description="Compare all iTerm themes from CSV vs one Neovim theme."
+        description="Compare all iTerm themes from CSV vs one or more Neovim themes."
     )
     ap.add_argument(
         "--csv", required=True, help="CSV file with columns: name,url for iTerm themes"
     )
     ap.add_argument(
-        "--nvim", required=True, help="Neovim theme (repo URL or raw file URL)"
+        "--nvim",
+        required=True,
+        nargs="+",
+        help="Neovim themes (repo or raw file URLs, tag=URL, or files listing them)",
     )
     ap.add_argument("--out", default="results.tsv", help="Output TSV file")
+    ap.add_argument(
+        "--out-pattern",
+        help="Also write one untagged TSV per target, e.g. ../data/interim/{tag}_results.tsv",
+    )
+    ap.add_argument(
+        "--delay", type=float, default=0.5, help="Seconds between iTerm downloads"
+    )
     args = ap.parse_args()
 
-    nvim_colors = load_nvim_colors(args.nvim)
-
-    results = []
+    try:
+        specs = parse_targets(args.nvim)
+    except ValueError as e:
+        sys.exit(str(e))
+    targets = load_targets(specs)
+    # tag rows with the nvim theme (as tag_nvim.py does) unless there is
+    # a single, untagged target
+    tagged = len(specs) > 1 or any(explicit for _, _, explicit in specs)
+
+    # all target palettes back to back; each iTerm scheme is scored against
+    # every target in one distance matrix
+    flat, offsets = [], [0]
+    for _, colors in targets:
+        flat.extend(colors)
+        offsets.append(len(flat))
+
+    results = {tag: [] for tag, _ in targets}
     with open(args.csv, newline="", encoding="utf-8") as f:
         reader = csv.DictReader(f)
         for row in reader:
             name, url = row["name"], row["url"]
             try:
-                score = compare_palettes(url, nvim_colors)
-                results.append((name, url, score))
-                print(f"{name}: {score:.2f}")
+                iterm = load_iterm_colors(url)
+                scores = symmetric_distance_rgb_many(iterm, flat, offsets)
+                for (tag, _), score in zip(targets, scores):
+                    results[tag].append((name, url, float(score)))
+                print(f"{name}: " + ", ".join(f"{s:.2f}" for s in scores))
             except Exception as e:
                 print(f"Skipping {name} ({url}) due to error: {e}", file=sys.stderr)
-            time.sleep(0.5)
+            time.sleep(args.delay)
 
-    # Sort results by best match (lowest score first)
-    results.sort(key=lambda x: x[2])
+    header = ["iterm_name", "iterm_url", "similarity_score"]
+    for rows in results.values():
+        # Sort results by best match (lowest score first)
+        rows.sort(key=lambda x: x[2])
 
     with open(args.out, "w", encoding="utf-8", newline="") as f:
         writer = csv.writer(f, delimiter="\t")
-        writer.writerow(["iterm_name", "iterm_url", "similarity_score"])
-        writer.writerows(results)
+        writer.writerow(header + ["nvimTheme"] if tagged else header)
+        for tag, rows in results.items():
+            writer.writerows([r + (tag,) for r in rows] if tagged else rows)
+
+    if args.out_pattern:
+        for tag, rows in results.items():
+            with open(
+                args.out_pattern.format(tag=tag), "w", encoding="utf-8", newline=""
+            ) as f:
+                writer = csv.writer(f, delimiter="\t")
+                writer.writerow(header)
+                writer.writerows(rows)
 
 
 if __name__ == "__main__":
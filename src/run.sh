@@ -1 +1 @@
-snakemake -s Snakefile.py -j1 -p all
+snakemake -s Snakefile.py --cores all -p all
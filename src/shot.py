@@ -1,5 +1,8 @@
 """Automate screenshots."""
 
+import argparse
+import hashlib
+import json
 import os
 import re
 import shlex
@@ -12,6 +15,11 @@ import pandas as pd
 
 CONFIG_PATH = Path.home() / ".config" / "ghostty" / "config"
 GHOSTTY_APP = "/Applications/Ghostty.app"
+SCREENSHOT_DIR = Path("../data/interim/screenshots")
+MANIFEST_NAME = "manifest.json"
+DEMO_SCRIPT = Path(__file__).with_name("theme_demo.py")
+# file opened in nvim by ensure_tmux_demo (~/projects/colors/src/shot.py)
+DEMO_FILE = Path(__file__)
 
 
 def ensure_tmux_intro():
@@ -215,7 +223,7 @@ def run_command_in_ghostty(cmd: str):
 
 
 def run_demo_in_ghostty(theme: str, nvim_theme: str):
-    cmd = f'tmux send-keys -t demo "~/projects/colors/.venv/bin/python ~/projects/colors/src/theme_demo.py \\"{theme}\\" \\"{nvim_theme}\\"" C-m'
+    cmd = f'tmux send-keys -t demo "~/projects/colors/.venv/bin/python ~/projects/colors/src/theme_demo.py --fast \\"{theme}\\" \\"{nvim_theme}\\"" C-m'
     # cmd = f'tmux send-keys -t demo "bash ~/projects/colors/src/theme_demo.sh \\"{theme}\\" \\"{nvim_theme}\\"" C-m'
     # cmd = (
     #     f'tmux send-keys -t demo:0.0 "bash ~/projects/theme_demo.sh \\"{theme}\\"" C-m'
@@ -268,7 +276,7 @@ def run_intro_message(delay=2.0):
     print("🎬 Printed intro message")
 
     time.sleep(delay + 0.5)
-    screenshot_ghostty("../data/interim/screenshots/aa.png")
+    screenshot_ghostty(SCREENSHOT_DIR / "aa.png")
     time.sleep(delay + 0.5)
 
 
@@ -295,38 +303,149 @@ def run_final_message():
     print("🎉 Printed final combo message")
 
 
-def cycle_themes(theme_dict, outdir: str, delay=1.0):
+# ---------- Render manifest ----------
+def ghostty_font_family():
+    """font-family lines from the Ghostty config (font-size is hashed separately)."""
+    if not CONFIG_PATH.exists():
+        return []
+    return [
+        line.strip()
+        for line in CONFIG_PATH.read_text().splitlines()
+        if line.strip().startswith("font-family")
+    ]
+
+
+def render_key(iterm_theme, nvim_theme, font_size, window_size):
+    """Hash of every input that changes the rendered frame."""
+    h = hashlib.sha256()
+    inputs = {
+        "iterm_theme": iterm_theme,
+        "nvim_theme": nvim_theme,
+        "font_size": font_size,
+        "window_size": list(window_size),
+        "font_family": ghostty_font_family(),
+    }
+    h.update(json.dumps(inputs, sort_keys=True).encode("utf-8"))
+    for path in (DEMO_SCRIPT, DEMO_FILE):
+        h.update(path.read_bytes() if path.exists() else b"")
+    return h.hexdigest()
+
+
+def load_manifest(outdir: Path):
+    path = outdir / MANIFEST_NAME
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text())
+
+
+def save_manifest(outdir: Path, manifest):
+    path = outdir / MANIFEST_NAME
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(manifest, indent=2, sort_keys=True) + "\n")
+    tmp.replace(path)
+
+
+def is_rendered(manifest, outfile: Path, key):
+    """True when the PNG exists and was rendered from the same inputs."""
+    entry = manifest.get(outfile.name)
+    return outfile.exists() and entry is not None and entry.get("key") == key
+
+
+def dhash(png: Path, size=8):
+    """64-bit difference hash of a screenshot."""
+    from PIL import Image
+
+    img = Image.open(png).convert("L").resize((size + 1, size))
+    px = list(img.getdata())
+    bits = 0
+    for row in range(size):
+        for col in range(size):
+            left = px[row * (size + 1) + col]
+            right = px[row * (size + 1) + col + 1]
+            bits = (bits << 1) | (left > right)
+    return bits
+
+
+def flag_near_duplicates(outdir: Path, manifest, max_distance=4):
+    """Print pairs of screenshots whose dhashes differ by <= max_distance bits."""
+    hashes = {}
+    for name, entry in manifest.items():
+        png = outdir / name
+        if not png.exists():
+            continue
+        if "dhash" not in entry:
+            entry["dhash"] = f"{dhash(png):016x}"
+        hashes[name] = int(entry["dhash"], 16)
+    names = sorted(hashes)
+    dupes = []
+    for i, a in enumerate(names):
+        for b in names[i + 1 :]:
+            dist = bin(hashes[a] ^ hashes[b]).count("1")
+            if dist <= max_distance:
+                dupes.append((a, b, dist))
+                print(f"⚠️ Near-identical frames: {a} ~ {b} (distance {dist})")
+    return dupes
+
+
+def cycle_themes(
+    theme_dict, outdir: str, delay=1.0, force=False, flag_duplicates=None
+):
     outdir = Path(outdir)
     outdir.mkdir(parents=True, exist_ok=True)
-    set_ghostty_font(size=20)
-    time.sleep(0.1)
-    run_intro_message()
+    manifest = load_manifest(outdir)
+    font_size = 32
+    window_size = (1080, 1920)
+
+    todo = []
     for iterm_theme in theme_dict:
         for nvim_theme in theme_dict[iterm_theme]:
+            tname = iterm_theme.replace(" ", "_").replace("/", "_")
+            n_name = nvim_theme.replace(" ", "_").replace("/", "_")
+            outfile = outdir / f"{tname}__{n_name}.png"
+            key = render_key(iterm_theme, nvim_theme, font_size, window_size)
+            if not force and is_rendered(manifest, outfile, key):
+                print(f"⏭️ Skipping {outfile.name} (inputs unchanged)")
+                continue
+            todo.append((iterm_theme, nvim_theme, outfile, key))
+
+    bookends = [outdir / "aa.png", outdir / "zz.png"]
+    if todo or force or not all(p.exists() for p in bookends):
+        set_ghostty_font(size=20)
+        time.sleep(0.1)
+        run_intro_message()
+        for iterm_theme, nvim_theme, outfile, key in todo:
             ensure_tmux_demo(nvim_theme)
             print("=== Theme:", iterm_theme)
             write_theme(iterm_theme)
-            set_ghostty_font(size=32)
+            set_ghostty_font(size=font_size)
             reload_ghostty("demo")
             # wait for UI to settle (rendering, window appear)
             time.sleep(delay + 0.5)
             # run_command_in_ghostty(f'bash ~/projects/colors/src/theme_demo.sh "{theme}"')
             # run_command_in_ghostty("l ~/projects/colors/src/")
-            resize_ghostty()
+            resize_ghostty(*window_size)
             time.sleep(delay + 0.1)
             run_demo_in_ghostty(iterm_theme, nvim_theme)
             time.sleep(delay + 0.5)
-            tname = iterm_theme.replace(" ", "_").replace("/", "_")
-            n_name = nvim_theme.replace(" ", "_").replace("/", "_")
-            screenshot_ghostty(
-                Path("../data/interim/screenshots") / f"{tname}__{n_name}.png"
-            )
+            screenshot_ghostty(outfile)
+            manifest[outfile.name] = {
+                "key": key,
+                "iterm_theme": iterm_theme,
+                "nvim_theme": nvim_theme,
+            }
+            save_manifest(outdir, manifest)
             time.sleep(delay + 0.5)
-    set_ghostty_font(size=22)
-    time.sleep(0.1)
-    run_final_message()
-    time.sleep(2)
-    screenshot_ghostty(Path("../data/interim/screenshots") / "zz.png")
+        set_ghostty_font(size=22)
+        time.sleep(0.1)
+        run_final_message()
+        time.sleep(2)
+        screenshot_ghostty(outdir / "zz.png")
+    else:
+        print("✅ All screenshots up to date")
+
+    if flag_duplicates is not None:
+        flag_near_duplicates(outdir, manifest, max_distance=flag_duplicates)
+        save_manifest(outdir, manifest)
 
 
 def init_d():
@@ -334,6 +453,21 @@ def init_d():
 
 
 if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Screenshot the top theme combos.")
+    ap.add_argument(
+        "--force",
+        action="store_true",
+        help="Re-render every combo even if the manifest says it is up to date",
+    )
+    ap.add_argument(
+        "--flag-duplicates",
+        type=int,
+        default=None,
+        metavar="BITS",
+        help="Flag screenshots whose perceptual hashes differ by <= BITS bits",
+    )
+    args = ap.parse_args()
+
     cols = ["nvim_name", "colorscheme_name"]
     inside_nvim_names = pd.read_csv(Path("../data/end/theme_list.csv"))[cols]
     theme_file = Path("../data/end/top50_filtered.tsv")
@@ -376,4 +510,10 @@ if __name__ == "__main__":
     for _, row in df.iterrows():
         iterm_to_nvim[row["iterm_name"]][row["colorscheme_name"]] = row["nvim_url"]
 
-    cycle_themes(iterm_to_nvim, outdir="../data/interim/screenshots", delay=2.0)
+    cycle_themes(
+        iterm_to_nvim,
+        outdir=SCREENSHOT_DIR,
+        delay=2.0,
+        force=args.force,
+        flag_duplicates=args.flag_duplicates,
+    )
@@ -1,70 +1,14 @@
 #!/usr/bin/env python3
 import argparse
-import csv
-import os
-import re
-import time
-from urllib.parse import urlparse
 
-import requests
-from dotenv import load_dotenv
-
-HEX_RE = re.compile(r"#(?:[0-9A-Fa-f]{6})")
-
-# --- Load .env ---
-load_dotenv()
-GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
-HEADERS = {"Authorization": f"token {GITHUB_TOKEN}"} if GITHUB_TOKEN else {}
-if not GITHUB_TOKEN:
-    print(
-        "⚠️  No GITHUB_TOKEN found in environment. Using unauthenticated mode (60 req/hr)."
-    )
-
-
-def is_github_repo_url(url):
-    u = urlparse(url)
-    parts = [p for p in u.path.split("/") if p]
-    return u.netloc == "github.com" and len(parts) == 2
-
-
-def get_repo_tree(owner, repo):
-    api = f"https://api.github.com/repos/{owner}/{repo}/git/trees/HEAD?recursive=1"
-    r = requests.get(api, headers=HEADERS, timeout=20)
-    if r.status_code != 200:
-        return None, f"API error {r.status_code}"
-    return r.json().get("tree", []), None
-
-
-def fetch_raw_file(owner, repo, path):
-    raw_url = f"https://raw.githubusercontent.com/{owner}/{repo}/HEAD/{path}"
-    r = requests.get(raw_url, timeout=20)
-    if r.status_code == 200:
-        return r.text
-    return ""
-
-
-def extract_colors_from_text(text):
-    hexes = set(HEX_RE.findall(text))
-    for m in re.findall(r"0x([0-9A-Fa-f]{6})", text):
-        hexes.add("#" + m)
-    return sorted(hexes)
-
-
-def repo_extract_colors(owner, repo):
-    tree, err = get_repo_tree(owner, repo)
-    if tree is None:
-        return [], err
-    colors = set()
-    for obj in tree:
-        path = obj.get("path", "").lower()
-        if path.endswith((".lua", ".vim")) and any(
-            seg in path for seg in ("color", "theme", "palette")
-        ):
-            text = fetch_raw_file(owner, repo, obj["path"])
-            colors.update(extract_colors_from_text(text))
-    if colors:
-        return sorted(colors), "theme file found"
-    return [], "no theme files"
+from colors.cli import (
+    add_blob_cache_argument,
+    add_journal_arguments,
+    add_pipeline_arguments,
+    add_refresh_meta_argument,
+)
+from colors.extract import harvest_nvim
+from colors.fetch import github_tokens
 
 
 def main():
@@ -77,30 +21,30 @@ def main():
         default="../data/interim/urls/nvim_check_results.tsv",
         help="Output TSV file",
     )
+    add_journal_arguments(ap)
+    add_blob_cache_argument(ap)
+    add_refresh_meta_argument(ap)
+    add_pipeline_arguments(ap)
     args = ap.parse_args()
 
-    results = []
-    with open(args.csv, newline="", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            name, url = row["name"], row["url"]
-            if not is_github_repo_url(url):
-                results.append((name, url, "invalid_repo_url", ""))
-                print(f"{name}: {url} -> invalid_repo_url")
-                continue
-
-            owner, repo = [p for p in urlparse(url).path.split("/") if p]
-            colors, reason = repo_extract_colors(owner, repo)
-            status = "compatible" if colors else f"incompatible ({reason})"
-            color_str = ",".join(colors)
-            results.append((name, url, status, color_str))
-            print(f"{name}: {url} -> {status}, {len(colors)} colors found")
-            time.sleep(0.5)
-
-    with open(args.out, "w", encoding="utf-8", newline="") as f:
-        writer = csv.writer(f, delimiter="\t")
-        writer.writerow(["name", "url", "status", "colors"])
-        writer.writerows(results)
+    tokens = github_tokens()
+    if not tokens:
+        print(
+            "⚠️  No GITHUB_TOKEN found in environment. Using unauthenticated mode (60 req/hr)."
+        )
+    else:
+        print(f"Using {len(tokens)} GitHub token(s)")
+
+    harvest_nvim(
+        args.csv,
+        args.out,
+        resume=args.resume,
+        journal=args.journal,
+        blob_cache=args.blob_cache,
+        fetchers=args.fetchers,
+        extractors=args.extractors,
+        refresh_meta=args.refresh_meta,
+    )
 
 
 if __name__ == "__main__":
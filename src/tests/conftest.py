@@ -0,0 +1,18 @@
+import pytest
+
+from tests.helpers import GitHubStub
+
+
+@pytest.fixture
+def github_stub(monkeypatch):
+    """colors.fetch pointed at a GitHubStub, with one fake token."""
+    from colors import fetch
+
+    stub = GitHubStub()
+    monkeypatch.setattr(fetch, "GITHUB_API", stub.url)
+    monkeypatch.setattr(fetch, "GITHUB_GRAPHQL", f"{stub.url}/graphql")
+    monkeypatch.setattr(fetch, "github_tokens", lambda: ["test-token"])
+    monkeypatch.setattr(fetch, "_pool", None)
+    monkeypatch.setattr(fetch, "_meta_caches", {})
+    yield stub
+    stub.server.shutdown()
@@ -0,0 +1,106 @@
+"""Shared test helpers: recorded GitHub responses, a stub GitHub server
+and small colors TSV corpora."""
+
+import json
+import os
+import subprocess
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+
+def recorded(name):
+    """A recorded GitHub response body from tests/data."""
+    with open(os.path.join(DATA, name), encoding="utf-8") as f:
+        return json.load(f)
+
+
+class GitHubStub:
+    """Local HTTP server answering canned JSON per path, in order."""
+
+    def __init__(self):
+        self.routes = {}  # path -> [(status, body), ...], last one repeats
+        self.requests = []  # (method, path, query, json body)
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _answer(self):
+                path, _, query = self.path.partition("?")
+                n = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(n)) if n else None
+                stub.requests.append((self.command, path, query, body))
+                answers = stub.routes.get(path) or [(404, {"message": "Not Found"})]
+                status, payload = answers.pop(0) if len(answers) > 1 else answers[0]
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = do_POST = _answer
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def paths(self):
+        return [path for _, path, _, _ in self.requests]
+
+
+# ---------- Corpus helpers ----------
+SRC = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_colors(*args):
+    """python -m colors ARGS from src/, as the Snakefile runs it."""
+    subprocess.run(
+        [sys.executable, "-m", "colors", *map(str, args)],
+        cwd=SRC,
+        check=True,
+        capture_output=True,
+    )
+
+
+def write_colors_tsv(path, rows):
+    """(name, "#hex,...") rows -> name,url,colors TSV at path."""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("name\turl\tcolors\n")
+        f.writelines(f"{n}\thttps://x/{n}\t{c}\n" for n, c in rows)
+    return str(path)
+
+
+def random_palettes(rng, prefix, n, max_colors=20):
+    """n (name, "#hex,...") rows of 2 to max_colors - 1 random colors."""
+    return [
+        (
+            f"{prefix}{i}",
+            ",".join(
+                f"#{rng.randrange(1 << 24):06x}"
+                for _ in range(rng.randrange(2, max_colors))
+            ),
+        )
+        for i in range(n)
+    ]
+
+
+def compare_tsv(nvim, iterm, out, *extra):
+    """Bytes of a one-worker `colors compare` run."""
+    run_colors(
+        "compare",
+        "--nvim",
+        nvim,
+        "--iterm",
+        iterm,
+        "--out",
+        out,
+        "--workers",
+        1,
+        *extra,
+    )
+    return out.read_bytes()
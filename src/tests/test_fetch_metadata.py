@@ -0,0 +1,72 @@
+import json
+import time
+
+from colors import fetch
+from tests.helpers import recorded
+
+REPOS = [("folke", "tokyonight.nvim"), ("gone", "theme.nvim")]
+
+
+def test_graphql_batch_and_cache(github_stub, tmp_path):
+    github_stub.routes["/graphql"] = [(200, recorded("graphql_metadata.json"))]
+    cache = str(tmp_path / "meta.json")
+
+    meta = fetch.resolve_repo_metadata(REPOS, cache_path=cache)
+    assert github_stub.paths() == ["/graphql"]
+    tokyo = meta["folke/tokyonight.nvim"]
+    assert tokyo["default_branch"] == "main"
+    assert tokyo["head_sha"] == "c3" * 20
+    assert tokyo["root_entries"][1] == {
+        "path": "README.md",
+        "type": "blob",
+        "sha": "b2" * 20,
+        "size": 812,
+    }
+    assert meta["gone/theme.nvim"]["error"] == "not found"
+
+    # a repo that does not exist is cached like a found one
+    with open(cache, encoding="utf-8") as f:
+        assert sorted(json.load(f)) == ["folke/tokyonight.nvim", "gone/theme.nvim"]
+
+    # fresh entries are served from the cache
+    assert fetch.resolve_repo_metadata(REPOS, cache_path=cache) == meta
+    assert len(github_stub.requests) == 1
+
+
+def test_rate_limited_lookup_is_retried(github_stub, tmp_path):
+    github_stub.routes["/graphql"] = [
+        (200, recorded("graphql_rate_limited.json")),
+        (200, recorded("graphql_metadata.json")),
+    ]
+    cache = str(tmp_path / "meta.json")
+
+    meta = fetch.resolve_repo_metadata(REPOS[:1], cache_path=cache)
+    assert meta["folke/tokyonight.nvim"] == {"error": "RATE_LIMITED"}
+    # rate-limited lookups are never written to the cache
+    assert fetch._meta_caches[cache] == {}
+    meta = fetch.resolve_repo_metadata(REPOS[:1], cache_path=cache)
+    assert meta["folke/tokyonight.nvim"]["head_sha"] == "c3" * 20
+
+
+def test_stale_and_refresh(github_stub, tmp_path):
+    github_stub.routes["/graphql"] = [(200, recorded("graphql_metadata.json"))]
+    cache = str(tmp_path / "meta.json")
+    fetch.resolve_repo_metadata(REPOS[:1], cache_path=cache)
+    fetch.resolve_repo_metadata(REPOS[:1], cache_path=cache)
+    assert len(github_stub.requests) == 1
+
+    fetch.resolve_repo_metadata(REPOS[:1], cache_path=cache, refresh=True)
+    assert len(github_stub.requests) == 2
+
+    entry = fetch._meta_caches[cache]["folke/tokyonight.nvim"]
+    entry["fetched_at"] = time.time() - fetch.META_TTL - 1
+    fetch.resolve_repo_metadata(REPOS[:1], cache_path=cache)
+    assert len(github_stub.requests) == 3
+
+
+def test_cache_keyed_by_path(github_stub, tmp_path):
+    github_stub.routes["/graphql"] = [(200, recorded("graphql_metadata.json"))]
+    fetch.resolve_repo_metadata(REPOS[:1], cache_path=str(tmp_path / "a.json"))
+    fetch.resolve_repo_metadata(REPOS[:1], cache_path=str(tmp_path / "b.json"))
+    assert len(github_stub.requests) == 2
+    assert (tmp_path / "b.json").exists()
@@ -0,0 +1,31 @@
+from urllib.parse import parse_qs
+
+from colors import fetch
+from tests.helpers import recorded
+
+
+def test_search_topic_repos_pages_and_names(github_stub, monkeypatch):
+    pages = recorded("search_repositories.json")
+    monkeypatch.setattr(fetch, "SEARCH_PER_PAGE", 2)
+    # both topics answer the same pages, in page order per request
+    github_stub.routes["/search/repositories"] = [
+        (200, pages["page1"]),
+        (200, pages["page1"]),
+        (200, pages["page2"]),
+    ]
+
+    rows = list(fetch.search_topic_repos(("neovim-colorscheme", "nvim-theme")))
+    queries = [parse_qs(q) for _, _, q, _ in github_stub.requests]
+    # page 1 of each topic, then page 2 of each
+    assert sorted((q["q"][0], q["page"][0]) for q in queries) == [
+        ("topic:neovim-colorscheme", "1"),
+        ("topic:neovim-colorscheme", "2"),
+        ("topic:nvim-theme", "1"),
+        ("topic:nvim-theme", "2"),
+    ]
+    # deduped by repo id; bare repo names like the scraper, owner in the url
+    assert sorted(rows) == [
+        ("nightfox.nvim", "https://github.com/EdenEast/nightfox.nvim"),
+        ("nvim", "https://github.com/catppuccin/nvim"),
+        ("tokyonight.nvim", "https://github.com/folke/tokyonight.nvim"),
+    ]
@@ -0,0 +1,68 @@
+import hashlib
+
+import pytest
+
+from colors import extract, fetch
+
+PALETTE = " ".join(f"#{i * 40503 % (1 << 24):06x}" for i in range(1, 21))
+
+
+def sha(text):
+    return hashlib.sha1(text.encode()).hexdigest()
+
+
+@pytest.fixture
+def repos(tmp_path, monkeypatch):
+    """Fake GitHub: repos whose variant files repeat one palette, so the
+    patience stop ends each repo's fetching early."""
+    trees = {}
+    for k in range(6):
+        files = {"lua/x/palette.lua": PALETTE + f" #00000{k}"}
+        files.update({f"lua/x/colors/v{v}.lua": PALETTE + " " * v for v in range(6)})
+        trees[f"r{k}"] = files
+    trees["r5"] = {"README.md": "no theme here"}
+    fetched = []
+
+    def tree(owner, repo, ref="HEAD"):
+        if repo == "down":
+            return None, "API error 502"
+        listing = [
+            {"path": p, "type": "blob", "size": len(t), "sha": sha(t)}
+            for p, t in trees[repo].items()
+        ]
+        return listing, None
+
+    def raw(owner, repo, path, ref="HEAD"):
+        fetched.append((repo, path))
+        return trees[repo][path]
+
+    monkeypatch.setattr(fetch, "get_repo_tree", tree)
+    monkeypatch.setattr(fetch, "fetch_raw_file", raw)
+    monkeypatch.setattr(fetch, "github_token", lambda: None)
+    csv_path = tmp_path / "repos.csv"
+    rows = [f"{r},https://github.com/o/{r}" for r in trees]
+    rows += ["down,https://github.com/o/down", "bad,https://gitlab.com/o/bad"]
+    csv_path.write_text("name,url\n" + "\n".join(rows) + "\n")
+    return str(csv_path), fetched
+
+
+def harvest(csv_path, out, fetchers):
+    extract.harvest_nvim(
+        csv_path, str(out), delay=0, blob_cache=None, fetchers=fetchers, extractors=1
+    )
+    return out.read_text()
+
+
+def test_pipeline_matches_serial_output_and_requests(repos, tmp_path):
+    csv_path, fetched = repos
+    serial = harvest(csv_path, tmp_path / "serial.tsv", 0)
+    serial_fetches = sorted(fetched)
+    fetched.clear()
+    piped = harvest(csv_path, tmp_path / "piped.tsv", 4)
+
+    assert piped == serial
+    assert sorted(fetched) == serial_fetches
+    # patience stopped every repo well before its 7 candidate files
+    assert len(serial_fetches) < 5 * 7
+    assert "incompatible (API error 502)" in serial
+    assert "\tinvalid_repo_url\t" in serial
@@ -0,0 +1,89 @@
+import csv
+
+from colors import extract
+from colors.journal import read_journal
+
+
+def write_csv(path, names):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(["name", "url"])
+        w.writerows((n, f"https://example.com/{n}.itermcolors") for n in names)
+
+
+def read_tsv(path):
+    with open(path, encoding="utf-8") as f:
+        return [line.split("\t") for line in f.read().splitlines()[1:]]
+
+
+def test_resume_skips_done_and_retries_failed(tmp_path, monkeypatch):
+    src, out = tmp_path / "in.csv", tmp_path / "out.tsv"
+    write_csv(src, ["a", "b", "c"])
+    calls = []
+    down = {"b"}
+
+    def load(url):
+        name = url.rsplit("/", 1)[1].split(".")[0]
+        calls.append(name)
+        if name in down:
+            raise ConnectionError("rate limited")
+        return [(1, 2, 3)]
+
+    monkeypatch.setattr(extract, "load_iterm_colors", load)
+    extract.harvest_iterm(str(src), str(out))
+    assert calls == ["a", "b", "c"]
+    assert [r[2] for r in read_tsv(out)] == ["#010203", "", "#010203"]
+
+    calls.clear()
+    down.clear()
+    extract.harvest_iterm(str(src), str(out), resume=True)
+    assert calls == ["b"]
+    assert [r[2] for r in read_tsv(out)] == ["#010203"] * 3
+
+
+def test_torn_journal_line_is_redone(tmp_path, monkeypatch):
+    src, out = tmp_path / "in.csv", tmp_path / "out.tsv"
+    write_csv(src, ["a", "b"])
+    monkeypatch.setattr(extract, "load_iterm_colors", lambda url: [(0, 0, 0)])
+    extract.harvest_iterm(str(src), str(out))
+    journal = f"{out}.journal.jsonl"
+    with open(journal, "rb+") as f:
+        data = f.read()
+        f.truncate(len(data) - 5)
+    assert list(read_journal(journal)) == ["https://example.com/a.itermcolors"]
+
+    calls = []
+
+    def load(url):
+        calls.append(url)
+        return [(0, 0, 0)]
+
+    monkeypatch.setattr(extract, "load_iterm_colors", load)
+    extract.harvest_iterm(str(src), str(out), resume=True)
+    assert calls == ["https://example.com/b.itermcolors"]
+    assert len(read_tsv(out)) == 2
+
+
+def test_nvim_resume_retries_only_transient_api_errors(tmp_path, monkeypatch):
+    from colors import fetch
+
+    src, out = tmp_path / "in.csv", tmp_path / "out.tsv"
+    src.write_text(
+        "name,url\n"
+        + "".join(
+            f"{r},https://github.com/o/{r}\n" for r in ("gone", "busy", "limited")
+        )
+    )
+    codes = {"gone": 404, "busy": 502, "limited": 403}
+    calls = []
+
+    def tree(owner, repo, ref="HEAD"):
+        calls.append(repo)
+        return None, f"API error {codes[repo]}"
+
+    monkeypatch.setattr(fetch, "get_repo_tree", tree)
+    monkeypatch.setattr(fetch, "github_token", lambda: None)
+    extract.harvest_nvim(str(src), str(out), delay=0, blob_cache=None)
+    calls.clear()
+    extract.harvest_nvim(str(src), str(out), delay=0, blob_cache=None, resume=True)
+    assert calls == ["busy", "limited"]
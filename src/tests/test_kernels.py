@@ -0,0 +1,100 @@
+import random
+
+import numpy as np
+import pytest
+
+from colors.rank import compare_all, load_themes
+from tests.helpers import random_palettes, write_colors_tsv
+
+
+@pytest.fixture(scope="module")
+def corpus(tmp_path_factory):
+    """Small nvim/iTerm TSVs with varied palette sizes and a shared palette."""
+    rng = random.Random(7)
+    tmp = tmp_path_factory.mktemp("kernels")
+    nvim = random_palettes(rng, "nv", 9, max_colors=40)
+    nvim.append(("fork", nvim[0][1]))
+    iterm = random_palettes(rng, "it", 12, max_colors=30)
+    return write_colors_tsv(tmp / "nvim.tsv", nvim), write_colors_tsv(
+        tmp / "iterm.tsv", iterm
+    )
+
+
+def scores(rows):
+    return {(r[0], r[1]): (r[3], r[4]) for r in rows}
+
+
+def run(corpus, metric, kernel="pairs", precision="float64", dedupe=False, workers=1):
+    nvim_path, iterm_path = corpus
+    nvim = load_themes(nvim_path, metric=metric, precision=precision)
+    iterm = load_themes(iterm_path, metric=metric, precision=precision)
+    rows = compare_all(
+        nvim,
+        iterm,
+        workers=workers,
+        dedupe=dedupe,
+        metric=metric,
+        precision=precision,
+        kernel=kernel,
+    )
+    return scores(rows)
+
+
+def assert_close(ref, cand, atol):
+    assert ref.keys() == cand.keys()
+    keys = sorted(ref)
+    np.testing.assert_allclose(
+        [ref[k] for k in keys], [cand[k] for k in keys], rtol=0, atol=atol
+    )
+
+
+@pytest.mark.parametrize("metric", ["ciede2000", "cie76", "oklab"])
+def test_dense_matches_pairs(corpus, metric):
+    assert_close(run(corpus, metric), run(corpus, metric, "dense"), 1e-9)
+
+
+@pytest.mark.parametrize("metric", ["ciede2000", "oklab"])
+def test_dedupe_matches_every_pair(corpus, metric):
+    assert_close(run(corpus, metric), run(corpus, metric, dedupe=True), 1e-9)
+
+
+@pytest.mark.parametrize("metric", ["ciede2000", "cie94", "oklab"])
+def test_tiled_matches_pairs(corpus, metric):
+    assert_close(run(corpus, metric), run(corpus, metric, "tiled"), 1e-9)
+
+
+def test_tiled_ciede2000_uses_the_pool(corpus, monkeypatch):
+    from colors import tiled
+
+    calls = []
+    pooled = tiled.pooled_all_pairs
+
+    def spy(*args):
+        calls.append(args[-1])
+        return pooled(*args)
+
+    monkeypatch.setattr(tiled, "pooled_all_pairs", spy)
+    one = run(corpus, "ciede2000", "tiled")
+    two = run(corpus, "ciede2000", "tiled", workers=2)
+    assert calls == [1, 2]
+    assert_close(one, two, 0)
+
+
+@pytest.mark.parametrize("kernel", ["pairs", "dense", "tiled"])
+@pytest.mark.parametrize("metric", ["ciede2000", "oklab"])
+def test_float32_close_to_float64(corpus, metric, kernel):
+    ref = run(corpus, metric)
+    # float32 coordinates (uint8 RGB) only move scores by rounding noise
+    assert_close(ref, run(corpus, metric, kernel, precision="float32"), 1e-3)
+
+
+def test_float32_packs_uint8_rgb(corpus):
+    from colors.rank import pack_palettes
+
+    iterm = load_themes(corpus[1], precision="float32")
+    assert iterm[0]["rgb8"].dtype == np.uint8
+    assert pack_palettes(iterm, "float32")["rgbs"].dtype == np.uint8
+    # integer RGB distances are exact: dense matches pairs to summation order
+    pairs = run(corpus, "oklab", precision="float32")
+    dense = run(corpus, "oklab", "dense", precision="float32")
+    assert max(abs(pairs[k][0] - dense[k][0]) for k in pairs) < 1e-9
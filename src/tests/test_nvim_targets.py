@@ -0,0 +1,38 @@
+import pytest
+
+from nvim_vs_all_iterm import load_targets, parse_targets
+
+
+def test_same_repo_name_gets_owner_tags():
+    tags = [
+        tag
+        for tag, _, _ in parse_targets(
+            [
+                "https://github.com/catppuccin/nvim",
+                "https://github.com/other/nvim",
+                "https://github.com/gbprod/nord.nvim",
+            ]
+        )
+    ]
+    assert tags == ["catppuccin__nvim", "other__nvim", "nord.nvim"]
+
+
+def test_explicit_tags_win_and_must_be_unique():
+    targets = parse_targets(["https://x.com/a/nord", "nord=https://github.com/x/y"])
+    assert [t for t, _, _ in targets] == ["nord__2", "nord"]
+    with pytest.raises(ValueError, match="duplicate target tags: a"):
+        parse_targets(["a=https://x.com/1", "a=https://x.com/2"])
+
+
+def test_unloadable_target_fails_loudly(monkeypatch):
+    import nvim_vs_all_iterm
+
+    def load(url):
+        if "broken" in url:
+            raise RuntimeError("API error 404")
+        return [(1, 2, 3)]
+
+    monkeypatch.setattr(nvim_vs_all_iterm, "load_nvim_colors", load)
+    targets = parse_targets(["ok=https://x.com/ok", "bad=https://x.com/broken"])
+    with pytest.raises(SystemExit, match="bad \\(https://x.com/broken\\): API error"):
+        load_targets(targets)
@@ -0,0 +1,47 @@
+from colors.serve import Corpus, answer, compare, health, nearest
+from tests.helpers import write_colors_tsv
+
+NVIM = [("dark", "#000000,#1e1e2e,#cdd6f4"), ("light", "#ffffff,#eff1f5,#4c4f69")]
+ITERM = [("night", "#000000,#181825,#cdd6f4"), ("day", "#ffffff,#e6e9ef,#4c4f69")]
+
+
+def test_batch_errors_are_inline(tmp_path):
+    corpus = Corpus(
+        write_colors_tsv(tmp_path / "n.tsv", NVIM),
+        write_colors_tsv(tmp_path / "i.tsv", ITERM),
+    )
+    out = answer(
+        corpus,
+        compare,
+        [
+            {"nvim": "dark", "iterm": "night"},
+            "x",
+            ["x"],
+            {"nvim": "missing", "iterm": "night"},
+            {"nvim": 5, "iterm": "night"},
+            {"nvim": {"colors": ["nope"]}, "iterm": "day"},
+        ],
+    )
+    assert out[0]["lab_score"] < 5
+    assert out[1] == out[2] == {"error": "query must be a JSON object"}
+    assert out[3] == {"error": "unknown nvim theme: missing"}
+    assert out[4] == {"error": "nvim must be a theme name or a palette"}
+    assert "error" in out[5]
+
+    (best,) = answer(corpus, nearest, {"nvim": "light", "k": 1})
+    assert best["name"] == "day"
+
+
+def test_empty_corpus_starts(tmp_path):
+    corpus = Corpus(
+        write_colors_tsv(tmp_path / "n.tsv", NVIM),
+        write_colors_tsv(tmp_path / "i.tsv", []),
+    )
+    assert health(corpus)["iterm"] == 0
+    assert answer(corpus, nearest, {"nvim": "dark"}) == []
+    assert (
+        answer(corpus, nearest, {"colors": ["#000000"], "among": "nvim", "k": 1})[0][
+            "name"
+        ]
+        == "dark"
+    )
@@ -0,0 +1,26 @@
+import random
+
+from tests.helpers import compare_tsv, random_palettes, run_colors, write_colors_tsv
+
+
+def test_pack_compare_merge_is_byte_identical(tmp_path):
+    rng = random.Random(3)
+    nvim_rows = random_palettes(rng, "nv", 14)
+    nvim_rows.append(("nv0-fork", nvim_rows[0][1]))
+    nvim = write_colors_tsv(tmp_path / "nvim.tsv", nvim_rows)
+    iterm = write_colors_tsv(tmp_path / "iterm.tsv", random_palettes(rng, "it", 9))
+    full = compare_tsv(nvim, iterm, tmp_path / "full.tsv")
+
+    run_colors("pack", "--tsv", nvim, "--shards", 3, "--out-dir", tmp_path / "packed")
+    parts = []
+    for i in range(3):
+        part = tmp_path / f"part_{i}.tsv"
+        compare_tsv(tmp_path / "packed" / f"shard_{i}.tsv", iterm, part)
+        parts.append(part)
+    run_colors("merge", *parts, "--out", tmp_path / "merged.tsv")
+    assert (tmp_path / "merged.tsv").read_bytes() == full
+
+    # --shard i/N selects the same themes as pack
+    for i in range(3):
+        sel = compare_tsv(nvim, iterm, tmp_path / f"sel_{i}.tsv", "--shard", f"{i}/3")
+        assert sel == parts[i].read_bytes()
@@ -0,0 +1,28 @@
+import random
+
+from tests.helpers import compare_tsv, random_palettes, write_colors_tsv
+
+
+def test_score_store_reuse_is_byte_identical(tmp_path):
+    rng = random.Random(5)
+    nvim_rows = random_palettes(rng, "nv", 10)
+    nvim = write_colors_tsv(tmp_path / "nvim.tsv", nvim_rows)
+    iterm = write_colors_tsv(tmp_path / "iterm.tsv", random_palettes(rng, "it", 8))
+    store = tmp_path / "scores.db"
+
+    full = compare_tsv(nvim, iterm, tmp_path / "plain.tsv")
+    assert (
+        compare_tsv(nvim, iterm, tmp_path / "cold.tsv", "--score-store", store) == full
+    )
+    assert (
+        compare_tsv(nvim, iterm, tmp_path / "warm.tsv", "--score-store", store) == full
+    )
+
+    # one palette changed: its pairs are scored, the rest come from the store
+    nvim_rows[1] = ("nv1", "#123456,#abcdef")
+    changed = write_colors_tsv(tmp_path / "changed.tsv", nvim_rows)
+    want = compare_tsv(changed, iterm, tmp_path / "changed_plain.tsv")
+    got = compare_tsv(
+        changed, iterm, tmp_path / "changed_store.tsv", "--score-store", store
+    )
+    assert got == want
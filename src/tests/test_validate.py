@@ -0,0 +1,16 @@
+import pytest
+
+from colors.validate import check_engine_metric, compare_results, validate
+
+
+def test_colormath_rejects_metrics_it_lacks(tmp_path):
+    check_engine_metric("colormath", "ciede2000")
+    check_engine_metric("numpy", "oklab")
+    with pytest.raises(ValueError, match="colormath has no oklab"):
+        validate("n.tsv", "i.tsv", reference="colormath", metric="oklab")
+
+
+def test_identical_results_are_perfect():
+    rows = [("a", "x", "u1", 1.0, 2.0), ("a", "y", "u2", 3.0, 1.0)]
+    report = compare_results(rows, rows)
+    assert report["max_error_lab"] == 0 and report["min_tau"] == 1.0
@@ -1,16 +1,19 @@
+from __future__ import annotations
+
+import hashlib
 import os
 import sys
 import textwrap
 
-from pyfiglet import Figlet
-
-from rich.align import Align
-from rich.console import Console
-from rich.layout import Layout
-from rich.panel import Panel
-from rich.text import Text
-
-console = Console()
+# rich is imported lazily: the --fast path only needs it to (re)build the cache
+CACHE_DIR = (
+    os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"))
+    + "/colors/theme_demo"
+)
+SPACER_SIZE = 3
+NAME_PANEL_SIZE = 8
+ANSI_FG = {"magenta": 35, "cyan": 36}
+CLEAR = "\033[H\033[2J"
 
 
 def theme_panel(label: str, theme: str, color: str) -> Panel:
@@ -18,6 +21,10 @@ def theme_panel(label: str, theme: str, color: str) -> Panel:
     Render the theme name in a Panel, word-wrapping at ~20 characters
     without breaking words.
     """
+    from rich.align import Align
+    from rich.panel import Panel
+    from rich.text import Text
+
     # Wrap at word boundaries; do NOT break long words or hyphenated parts
     wrapped = textwrap.fill(
         theme.upper(), width=20, break_long_words=False, break_on_hyphens=False
@@ -35,6 +42,9 @@ def theme_panel(label: str, theme: str, color: str) -> Panel:
 
 
 def ansi_colors() -> Panel:
+    from rich.panel import Panel
+    from rich.text import Text
+
     txt = Text()
     for i in range(16):
         txt.append(f" {i:2} ", style=f"on color({i})")
@@ -42,6 +52,9 @@ def ansi_colors() -> Panel:
 
 
 def color_boxes() -> Panel:
+    from rich.panel import Panel
+    from rich.text import Text
+
     fg_colors = {
         30: "black",
         31: "red",
@@ -72,6 +85,9 @@ def color_boxes() -> Panel:
 
 
 def diff_colors() -> Panel:
+    from rich.panel import Panel
+    from rich.text import Text
+
     txt = Text()
     txt.append("+ Added line\n", style="green")
     txt.append("- Removed line\n", style="red")
@@ -79,17 +95,16 @@ def diff_colors() -> Panel:
     return Panel(txt, border_style="red", title="Diff")
 
 
-if __name__ == "__main__":
-    i_theme = sys.argv[1] if len(sys.argv) > 1 else "iTerm Theme"
-    n_theme = sys.argv[2] if len(sys.argv) > 2 else "Neovim Theme"
-
-    os.system("clear")
+def build_layout(i_theme: str, n_theme: str, names=True) -> Layout:
+    """Full demo layout; with names=False the name panels are left blank."""
+    from rich.layout import Layout
+    from rich.text import Text
 
     layout = Layout()
 
     # Add a top spacer row to push everything down
     layout.split_column(
-        Layout(name="spacer", size=3),
+        Layout(name="spacer", size=SPACER_SIZE),
         Layout(name="main", ratio=1),
     )
 
@@ -106,9 +121,144 @@ if __name__ == "__main__":
     )
 
     # Right side = theme name panels (equal size)
+    if names:
+        nvim_panel = theme_panel("NVIM THEME ⬆", n_theme, "magenta")
+        iterm_panel = theme_panel("ITERM THEME ⬇", i_theme, "cyan")
+    else:
+        nvim_panel = iterm_panel = Text("")
     layout["right"].split_column(
-        Layout(theme_panel("NVIM THEME ⬆", n_theme, "magenta"), size=8),
-        Layout(theme_panel("ITERM THEME ⬇", i_theme, "cyan"), size=8),
+        Layout(nvim_panel, size=NAME_PANEL_SIZE),
+        Layout(iterm_panel, size=NAME_PANEL_SIZE),
+    )
+    return layout
+
+
+# ---------- Fast start ----------
+def cache_path(cols: int, rows: int) -> str:
+    """Cache file for one terminal size, invalidated when this script changes."""
+    h = hashlib.sha1()
+    with open(__file__, "rb") as f:
+        h.update(f.read())
+    h.update(os.environ.get("TERM", "").encode())
+    h.update(os.environ.get("COLORTERM", "").encode())
+    return f"{CACHE_DIR}/{cols}x{rows}-{h.hexdigest()[:12]}.ansi"
+
+
+def build_static_frame(cols: int, rows: int):
+    """Render the layout with blank name panels and keep the left column as ANSI."""
+    import io
+
+    from rich.console import Console
+    from rich.segment import Segment, Segments
+
+    color_system = Console().color_system
+    console = Console(
+        file=io.StringIO(),
+        force_terminal=True,
+        width=cols,
+        height=rows,
+        color_system=color_system,
     )
+    left_width = cols // 2
+    splice = range(SPACER_SIZE, SPACER_SIZE + 2 * NAME_PANEL_SIZE)
+    lines = []
+    layout = build_layout("", "", names=False)
+    for row, line in enumerate(console.render_lines(layout, pad=False)):
+        if row in splice:
+            # keep only the left column; the name panels are drawn by fast_frame
+            line = next(Segment.divide(line, [left_width, cols]), [])
+        console.file = io.StringIO()
+        console.print(Segments(line), end="")
+        lines.append(console.file.getvalue())
+    return left_width, lines
+
+
+def load_static_frame(cols: int, rows: int):
+    path = cache_path(cols, rows)
+    try:
+        with open(path, "rb") as f:
+            data = f.read().decode("utf-8")
+        header, _, body = data.partition("\n")
+        return int(header), body.split("\n")
+    except (OSError, ValueError):
+        pass
+    left_width, lines = build_static_frame(cols, rows)
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}"
+    with open(tmp, "wb") as f:
+        f.write(f"{left_width}\n".encode() + "\n".join(lines).encode("utf-8"))
+    os.replace(tmp, path)
+    return left_width, lines
+
+
+def fast_theme_panel(label: str, theme: str, color: str, width: int) -> list:
+    """Plain-ANSI equivalent of theme_panel() at a fixed NAME_PANEL_SIZE height."""
+    sgr = f"\033[{ANSI_FG[color]}m"
+    bold = f"\033[1;{ANSI_FG[color]}m"
+    reset = "\033[0m"
+    inner = width - 2
+    content_width = inner - 4
+    content_rows = NAME_PANEL_SIZE - 4
+
+    wrapped = textwrap.fill(
+        theme.upper(), width=20, break_long_words=False, break_on_hyphens=False
+    )
+    text_lines = []
+    for line in wrapped.split("\n"):
+        text_lines.extend(textwrap.wrap(line, width=max(1, content_width)) or [""])
+    text_lines = text_lines[:content_rows]
+    block = max(len(line) for line in text_lines)
+    block_left = (content_width - block) // 2
+
+    title = f" {label} "
+    excess = inner - 2 - len(title)
+    top = "─" + "─" * (excess // 2) + title + "─" * (excess - excess // 2) + "─"
+    out = [f"{sgr}╭{top}╮{reset}"]
+    blank = f"{sgr}│{reset}{' ' * inner}{sgr}│{reset}"
+    body = [blank] * content_rows
+    first = (content_rows - len(text_lines)) // 2
+    for k, line in enumerate(text_lines):
+        pad = (block - len(line)) // 2
+        left = 2 + block_left + pad
+        right = inner - left - len(line)
+        body[first + k] = (
+            f"{sgr}│{reset}{' ' * left}{bold}{line}{reset}{' ' * right}{sgr}│{reset}"
+        )
+    out.append(blank)
+    out.extend(body)
+    out.append(blank)
+    out.append(f"{sgr}╰{'─' * inner}╯{reset}")
+    return out
+
+
+def fast_frame(i_theme: str, n_theme: str) -> str:
+    """Cached static panels with the two name panels spliced in."""
+    import shutil
+
+    cols, rows = shutil.get_terminal_size()
+    left_width, lines = load_static_frame(cols, rows)
+    right_width = cols - left_width
+    right = fast_theme_panel("NVIM THEME ⬆", n_theme, "magenta", right_width)
+    right += fast_theme_panel("ITERM THEME ⬇", i_theme, "cyan", right_width)
+    frame = list(lines)
+    for k, line in enumerate(right):
+        row = SPACER_SIZE + k
+        if row < len(frame):
+            frame[row] = frame[row] + line
+    return CLEAR + "\n".join(frame) + "\n"
+
+
+if __name__ == "__main__":
+    fast = "--fast" in sys.argv
+    argv = [a for a in sys.argv[1:] if a != "--fast"]
+    i_theme = argv[0] if len(argv) > 0 else "iTerm Theme"
+    n_theme = argv[1] if len(argv) > 1 else "Neovim Theme"
+
+    if fast:
+        sys.stdout.write(fast_frame(i_theme, n_theme))
+        sys.stdout.flush()
+    else:
+        from rich.console import Console
 
-    console.print(layout)
+        os.system("clear")
+        Console().print(build_layout(i_theme, n_theme))